@@ -0,0 +1,115 @@
+# Heap allocations of the ADC acquisition path, run on the device after uploading `src`:
+#   mpremote run benchmarks/adc_allocations.py
+# Queries alternate between channels, probes, profiles and burst sizes, so every completed query
+# reconfigures the ADC (WREG, START/STOP) and is expected to allocate 0 B
+import gc
+
+import app
+from measurements import measurements as m, ADCs, channels as ch, queries as q, sensors
+
+NUM_OF_ROUNDS = 5
+MAX_POLLS_PER_QUERY = 1000000
+
+PROBES = (sensors.SensorPt100, sensors.SensorPt1000, sensors.SensorNTC)
+PROFILES = ("fast", "balanced")
+BURST_SIZES = (1, 8)
+
+# ADS1148 is not fitted on PM1 boards, its driver talks to these otherwise unconnected GPIOs,
+# change them if your board uses them
+ADS1148_CS_PIN_ID = 22
+ADS1148_START_PIN_ID = 26
+ADS1148_RESET_PIN_ID = 27
+
+
+def run_query(adc: ADCs.SimpleADC, query: q.MeasurementQuery) -> None:
+    for _ in range(MAX_POLLS_PER_QUERY):
+        status = adc.measure(query).status
+
+        if status == q.ADC_DATA_READY:
+            return
+        if status == q.ADC_REFUSE:
+            raise Exception(f"ADC {adc.ID} refused a query for {query.num_of_readings} readings")
+
+    raise Exception(f"ADC {adc.ID} did not finish a query in {MAX_POLLS_PER_QUERY} polls")
+
+
+def run_queries(adc: ADCs.SimpleADC, queries: tuple, pipelined: bool) -> None:
+    for i in range(len(queries)):
+        if pipelined and i + 1 < len(queries):
+            # Accepted while the current query converts, the same way the controller does it
+            if adc.query_in_progress is None:
+                adc.measure(queries[i])
+            adc.queue_next(queries[i + 1]) # type: ignore
+
+        run_query(adc, queries[i])
+
+
+def count_allocations(adc: ADCs.SimpleADC, queries: tuple, pipelined: bool=False) -> int:
+    # First round builds anything cached by the ADC outside of the counted loop
+    run_queries(adc, queries, pipelined)
+
+    gc.collect()
+    gc.disable()
+    mem_before = gc.mem_alloc()
+
+    for _ in range(NUM_OF_ROUNDS):
+        run_queries(adc, queries, pipelined)
+
+    allocated = gc.mem_alloc() - mem_before
+    gc.enable()
+
+    return allocated
+
+
+def report(name: str, adc: ADCs.SimpleADC, queries: tuple, pipelined: bool=False) -> bool:
+    allocated = count_allocations(adc, queries, pipelined)
+    num_of_queries = NUM_OF_ROUNDS * len(queries)
+
+    print(f"{name}: {num_of_queries} queries, {allocated / num_of_queries:.1f} B/query allocated")
+    return allocated == 0
+
+
+def create_queries(adc: ADCs.SimpleADC, probes: tuple, profiles: tuple, burst_sizes: tuple, extra_attrs: tuple=({},)) -> tuple:
+    # Consecutive queries differ in channel and settings, so nothing is skipped as already configured
+    queries = []
+    for profile in profiles:
+        for num_of_readings in burst_sizes:
+            for probe in probes:
+                for attrs in extra_attrs:
+                    for channel in adc.channels:
+                        queries.append(q.MeasurementQuery(channel.ID_global, adc.ID, channel.ID_adc_channel, probe, num_of_readings, profile, attrs))
+
+    return tuple(queries)
+
+
+class ReadyPin():
+    # Nothing drives DRDY of the missing ADS1148, so every conversion is reported as finished
+    def value(self, *args) -> int:
+        return 0
+
+
+is_ok = True
+
+controller = m.initialize_measurements(app.AppState(), app.AppConfig())
+for adc in controller.ADCs:
+    name = type(adc).__name__
+    queries = create_queries(adc, PROBES, PROFILES, BURST_SIZES)
+
+    is_ok = report(name, adc, queries) and is_ok
+    if adc.SUPPORTS_PIPELINING:
+        is_ok = report(f"{name} pipelined", adc, queries, pipelined=True) and is_ok
+
+spi = controller.ADCs[0].spi # type: ignore
+ads1148 = ADCs.ADS1148_ADC(
+    ID=0,
+    channels=(ch.ADS1148_Channel(ID_global=0, ID_adc_channel=0), ch.ADS1148_Channel(ID_global=1, ID_adc_channel=1)),
+    start_pin_id=ADS1148_START_PIN_ID,
+    reset_pin_id=ADS1148_RESET_PIN_ID,
+)
+ads1148.initialize(spi_object=spi, CS_pin_id=ADS1148_CS_PIN_ID)
+ads1148.DRDY_pin = ReadyPin() # type: ignore
+
+queries = create_queries(ads1148, (sensors.SensorPt100,), ("default",), (1,), ({}, {"chopped": True}))
+is_ok = report("ADS1148_ADC", ads1148, queries) and is_ok
+
+print("OK: acquisition allocates nothing" if is_ok else "FAIL: acquisition allocates")
@@ -0,0 +1,58 @@
+# Boot path check: a config loaded from JSON because the binary image is missing must
+# end up written back as an image. Run on the device after uploading `src`:
+#   mpremote run benchmarks/config_fallback_check.py
+# Uses separate files, so the config saved on the device is left untouched
+import os
+
+import app
+import persistence
+import config_image
+
+JSON_FILENAME = "CHECK_CONFIG.json"
+IMAGE_FILENAME = "CHECK_CONFIG.bin"
+
+
+def remove(filename: str) -> None:
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+def new_config() -> app.AppConfig:
+    config = app.AppConfig()
+    config.SAVE_FILE_FILENAME = JSON_FILENAME
+    config.IMAGE_FILE_FILENAME = IMAGE_FILENAME
+    return config
+
+
+# Only the JSON file is on flash, like after updating from firmware without config images
+new_config().save_to_file()
+remove(IMAGE_FILENAME)
+
+# Same order as `device_init.initialize_device()`
+config = new_config()
+persistence_manager = persistence.PersistenceManager()
+persistence_manager.register("config", config)
+
+loaded_from_image = config.load()
+assert not loaded_from_image, "config should have been loaded from JSON"
+assert persistence_manager.get_stats()["dirty"] == ["config"], "JSON fallback did not mark the config as dirty"
+
+persistence_manager.run()
+assert persistence_manager.num_of_writes == 1, "dirty config was not saved"
+assert config_image.read_image(IMAGE_FILENAME, JSON_FILENAME) is not None, "config image was not written"
+
+# Next boot loads the image and writes nothing
+config = new_config()
+persistence_manager = persistence.PersistenceManager()
+persistence_manager.register("config", config)
+
+assert config.load(), "config should have been loaded from the image"
+persistence_manager.run()
+assert persistence_manager.num_of_writes == 0, "config loaded from the image was saved again"
+
+remove(JSON_FILENAME)
+remove(IMAGE_FILENAME)
+
+print("OK: JSON fallback rewrites the config image")
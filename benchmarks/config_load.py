@@ -0,0 +1,40 @@
+# JSON vs binary image config loading, run on the device after uploading `src`:
+#   mpremote run benchmarks/config_load.py
+# Uses separate files, so the config saved on the device is left untouched
+import gc
+import utime
+
+import app
+
+NUM_OF_LOADS = 10
+
+JSON_FILENAME = "BENCH_CONFIG.json"
+IMAGE_FILENAME = "BENCH_CONFIG.bin"
+
+
+def benchmark(load) -> tuple[int, int]:
+    gc.collect()
+    gc.disable()
+    mem_before = gc.mem_alloc()
+    start = utime.ticks_us()
+
+    for _ in range(NUM_OF_LOADS):
+        load()
+
+    elapsed_us = utime.ticks_diff(utime.ticks_us(), start)
+    allocated = gc.mem_alloc() - mem_before
+    gc.enable()
+
+    return elapsed_us, allocated
+
+
+config = app.AppConfig()
+config.save_to_file(JSON_FILENAME, IMAGE_FILENAME)
+
+for name, load in (
+    ("json", lambda: config.load_from_json(JSON_FILENAME)),
+    ("image", lambda: config.load(JSON_FILENAME, IMAGE_FILENAME)),
+):
+    elapsed_us, allocated = benchmark(load)
+
+    print(f"{name:>5}: {elapsed_us / NUM_OF_LOADS / 1000:.2f} ms/load, {allocated / NUM_OF_LOADS:.0f} B/load allocated")
@@ -0,0 +1,41 @@
+# Float vs fixed-point measurement pipeline, run on the device after uploading `src`:
+#   mpremote run benchmarks/conversion_pipeline.py
+import gc
+import utime
+
+import app
+from measurements import controllers as ct
+
+NUM_OF_SAMPLES = 2000
+
+# Pt100 at about 20 C (107.78 Ohm) with the default calibration
+READING = 3616000
+
+
+def benchmark(fixed_point: bool) -> tuple[int, int]:
+    config = app.AppConfig().channel_config
+    processor = ct.MeasurementProcessor(config, fixed_point=fixed_point)
+
+    # Build lookup tables outside of the measured loop
+    processor.process_reading(READING, 0)
+
+    gc.collect()
+    gc.disable()
+    mem_before = gc.mem_alloc()
+    start = utime.ticks_us()
+
+    for i in range(NUM_OF_SAMPLES):
+        processor.process_reading(READING + (i & 0xFF), 0)
+
+    elapsed_us = utime.ticks_diff(utime.ticks_us(), start)
+    allocated = gc.mem_alloc() - mem_before
+    gc.enable()
+
+    return elapsed_us, allocated
+
+
+for fixed_point in (False, True):
+    elapsed_us, allocated = benchmark(fixed_point)
+
+    print(f"{'fixed-point' if fixed_point else 'float':>11}: "
+          f"{elapsed_us / NUM_OF_SAMPLES:.1f} us/sample, {allocated / NUM_OF_SAMPLES:.1f} B/sample allocated")
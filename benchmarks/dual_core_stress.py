@@ -0,0 +1,66 @@
+# Measurement timing under communication load, single core vs dual core, run on the device after uploading `src`:
+#   mpremote run benchmarks/dual_core_stress.py
+# Lateness is how long a channel waited past its deadline, it grows when other work holds up the controller
+import json
+import utime
+
+import app
+from measurements import measurements as m, dual_core
+
+DURATION_MS = 20000
+INTERVAL_MS = 200
+
+# Stand-in for a web request: serialize a state sized payload, allocating as a real response does
+LOAD_PAYLOAD = [{"name": f"CH{i}", "values": list(range(32))} for i in range(16)]
+LOAD_REPEATS = 10
+
+
+def load_job() -> None:
+    for _ in range(LOAD_REPEATS):
+        json.dumps(LOAD_PAYLOAD)
+
+
+def create_controller():
+    app_state = app.AppState()
+    app_config = app.AppConfig()
+
+    for channel in app_config.channel_config:
+        channel.time_between_measurements_ms = INTERVAL_MS
+
+    return m.initialize_measurements(app_state, app_config)
+
+
+def benchmark(dual: bool) -> tuple[int, float, int]:
+    controller = create_controller()
+    core = dual_core.AcquisitionCore(controller) if dual else None
+    num_of_loads = 0
+
+    if core:
+        core.start()
+
+    start = utime.ticks_ms()
+    while utime.ticks_diff(utime.ticks_ms(), start) < DURATION_MS:
+        if core:
+            core.get_current_results()
+        else:
+            controller.run()
+
+        load_job()
+        num_of_loads += 1
+
+    if core:
+        core.stop()
+        utime.sleep_ms(100)
+
+    stats = controller.get_schedule_stats()
+    max_lateness_ms = max(s["max_lateness_ms"] for s in stats)
+    avg_lateness_ms = sum(s["avg_lateness_ms"] for s in stats) / len(stats)
+
+    return max_lateness_ms, avg_lateness_ms, num_of_loads
+
+
+for dual in (False, True):
+    max_lateness_ms, avg_lateness_ms, num_of_loads = benchmark(dual)
+
+    print(f"{'dual core' if dual else 'single core':>11}: "
+          f"max lateness {max_lateness_ms} ms, avg lateness {avg_lateness_ms:.1f} ms, {num_of_loads} load jobs")
@@ -1,11 +1,23 @@
 import json
+import utime
 
-from measurements import sensors
+import persistence
+import config_image
+
+from measurements import sensors, results
+from measurements.channel_config import ChannelConfig
 from device_config import __DeviceConfig, DeviceMode, NormalMode, EmergencyMode, ContinuousMode
+
+# Static start of the serialized state, encoded once
+STATE_INFO_HEADER_JSON = '{"info": ' + json.dumps({"NAME": __DeviceConfig.APP_NAME, "VERSION": __DeviceConfig.APP_VERSION}) + ', "data": '
     
 class AppState:
     SAVE_FILE_FILENAME = "SAVE_STATE.json"
 
+    # Stats change on every read, in the serialized state they are refreshed at most this often,
+    # so the cached JSON can be reused in between
+    STATS_MAX_AGE_MS = 1000
+
     DEFAULTS = {
         "device_mode": NormalMode,
         "is_initialized": False,
@@ -13,6 +25,13 @@ class AppState:
         "start_time_utc": None,
         "time_utc": None,
         "measurement_results": None,
+        "measurement_history": None,
+        "measurement_logger": None,
+        "schedule_stats": None,
+        "persistence_manager": None,
+        "memory_policy": None,
+        "profiler": None,
+        "results_source": None,
         "network_info": None,
         "wifi_ok": False
     }
@@ -28,84 +47,131 @@ class AppState:
         self.time_utc = d["time_utc"]
 
         self.measurement_results = d["measurement_results"]
+        self.measurement_history = d["measurement_history"]
+        self.measurement_logger = d["measurement_logger"]
+        self.schedule_stats = d["schedule_stats"]
+        self.persistence_manager = d["persistence_manager"]
+        self.memory_policy = d["memory_policy"]
+        self.profiler = d["profiler"]
+
+        # Object with `get_results_snapshot()`, normally the `MeasurementController`
+        self.results_source = d["results_source"]
+        self._cached_snapshot_version: int = -1
+        self._cached_state_json: str | None = None
+        self._cached_stats_json: str | None = None
+        self._stats_json: str | None = None
+        self._stats_ticks_ms: int = 0
+        self._cached_json: str = ""
+        self._cached_bytes: bytes | None = None
+
+        # Incremented on every change that should be saved, see `persistence.PersistenceManager`
+        self.version: int = 0
 
         self.network_info = d["network_info"]
         self.wifi_ok = d["wifi_ok"]
     
 
     def asdict(self) -> dict:
+        data = self.state_asdict()
+        data["measurement_results"] = self.measurement_results
+        data.update(self.stats_asdict())
+
+        return data
+
+    def state_asdict(self) -> dict:
         return {
             "device_mode": self.device_mode,
             "is_initialized": self.is_initialized, 
             "network_info": self.network_info,
             "wifi_ok": self.wifi_ok,
-            "free_memory": self.free_memory,
             # "time_utc": self.time_utc, 
             # "start_time_utc": self.start_time_utc, 
-            "measurement_results": self.measurement_results
         }
 
-    def asjson(self) -> str:
+    def stats_asdict(self) -> dict:
+        return {
+            "free_memory": self.free_memory,
+            "schedule_stats": self.schedule_stats,
+            "persistence_stats": self.persistence_manager.get_stats() if self.persistence_manager else None,
+            "memory_stats": self.memory_policy.get_stats() if self.memory_policy else None,
+        }
 
-        data = self.asdict()
-        for i, channel in enumerate(data["measurement_results"]):
-            if len(channel) > 0:
-                probe = channel["probe"]
-                data["measurement_results"][i]["probe"] = __DeviceConfig.SENSORS_AS_TEXT[probe]
+    def mark_dirty(self) -> None:
+        self.version += 1
 
-        data["device_mode"] = __DeviceConfig.MODES_AS_TEXT[data["device_mode"]]
+    def get_results_snapshot(self) -> results.ResultsSnapshot:
+        if self.results_source is None:
+            return results.EMPTY_SNAPSHOT
 
-        attrs = {
-            "info": {
-                "NAME": __DeviceConfig.APP_NAME,
-                "VERSION": __DeviceConfig.APP_VERSION,
-            },
-            "data": data,
-        }
+        return self.results_source.get_results_snapshot()
 
-        json_str = json.dumps(attrs)
+    def get_stats_json(self) -> str:
+        # Same string object until the stats are serialized again
+        now = utime.ticks_ms()
+        if self._stats_json is None or utime.ticks_diff(now, self._stats_ticks_ms) >= self.STATS_MAX_AGE_MS:
+            self._stats_json = json.dumps(self.stats_asdict())
+            self._stats_ticks_ms = now
 
-        # Reverse the operation, because it alters AppConfig state,
-        # A deep copy should be used here, but the implementation is not available in stock micropython
-        for i, channel in enumerate(data["measurement_results"]):
-            if len(channel) > 0:
-                probe = channel["probe"]
-                data["measurement_results"][i]["probe"] = __DeviceConfig.TEXT_AS_SENSOR[probe]
+        return self._stats_json
 
-        return json_str 
+    def asjson(self) -> str:
+        snapshot = self.get_results_snapshot()
 
-    def measurements_asjson(self) -> str:
-        data = self.measurement_results.copy()
-        for i, channel in enumerate(data):
-            if len(channel) > 0:
-                probe = channel["probe"]
-                data[i]["probe"] = __DeviceConfig.SENSORS_AS_TEXT[probe]
+        data = self.state_asdict()
+        data["device_mode"] = __DeviceConfig.MODES_AS_TEXT[data["device_mode"]]
+
+        # Only the small state part is serialized, results come from the snapshot cache and stats are refreshed periodically
+        state_json = json.dumps(data)
+        stats_json = self.get_stats_json()
+        if (snapshot.version == self._cached_snapshot_version and state_json == self._cached_state_json
+            and stats_json is self._cached_stats_json):
+            return self._cached_json
 
-        json_str = json.dumps(data)
+        json_str = STATE_INFO_HEADER_JSON + state_json[:-1] + ", " + stats_json[1:-1] + ', "measurement_results": ' + snapshot.asjson() + "}}"
 
-        for i, channel in enumerate(data):
-            if len(channel) > 0:
-                probe = channel["probe"]
-                data[i]["probe"] = __DeviceConfig.TEXT_AS_SENSOR[probe]
+        self._cached_snapshot_version = snapshot.version
+        self._cached_state_json = state_json
+        self._cached_stats_json = stats_json
+        self._cached_json = json_str
+        self._cached_bytes = None
 
         return json_str
 
-    def save_to_file(self, filename: str="") -> None:
+    def asbytes(self) -> bytes:
+        json_str = self.asjson()
+
+        if self._cached_bytes is None:
+            self._cached_bytes = json_str.encode()
+
+        return self._cached_bytes
+
+    def measurements_asjson(self) -> str:
+        return self.get_results_snapshot().asjson()
+
+    def measurements_asbytes(self) -> bytes:
+        return self.get_results_snapshot().asbytes()
+
+    def save_to_file(self, filename: str="") -> int:
         if len(filename) < 1:
             filename = self.SAVE_FILE_FILENAME
 
-        json_str = self.asjson()
-
-        with open(filename, "w", encoding="UTF-8") as f:
-            f.write(json_str)
+        return persistence.write_atomic(filename, self.asjson())
 
 
 class AppConfig():
     SAVE_FILE_FILENAME = "SAVE_CONFIG.json"
+    IMAGE_FILE_FILENAME = "SAVE_CONFIG.bin"
 
     DEFAULTS = {
         "other_config": {
-            "debug_enabled": False
+            "debug_enabled": False,
+            "continuous_mode_enabled": False,
+            "fixed_point_enabled": False,
+            "logging_enabled": False,
+            "config_image_enabled": True,
+            # Takes effect after a restart
+            "dual_core_enabled": False,
+            "profiling_enabled": False,
         },
         "wifi_config" : {
             "ssid": "ssid",
@@ -129,6 +195,8 @@ class AppConfig():
                 "time_between_measurements_ms": 0, 
                 "num_of_readings_to_store": 1,
                 "_calibration": (0.3, 0),
+                "acquisition_profile": "default",
+                "filters": [],
                 "_extra_attrs": {
                 }
             },
@@ -141,6 +209,8 @@ class AppConfig():
                 "time_between_measurements_ms": 0, 
                 "num_of_readings_to_store": 1,
                 "_calibration": (0.3, 0),
+                "acquisition_profile": "default",
+                "filters": [],
                 "_extra_attrs": {
                 }
             },
@@ -153,6 +223,8 @@ class AppConfig():
                 "time_between_measurements_ms": 0, 
                 "num_of_readings_to_store": 1,
                 "_calibration": (0.3, 0),
+                "acquisition_profile": "default",
+                "filters": [],
                 "_extra_attrs": {
                 }
             },
@@ -165,9 +237,12 @@ class AppConfig():
 
         self.wifi_config: dict = d["wifi_config"]
         self.modbus_config: dict = d["modbus_config"]
-        self.channel_config: list[dict] = d["channel_config"]
+        self.channel_config: list[ChannelConfig] = [ChannelConfig(channel) for channel in d["channel_config"]]
         self.other_config: dict = d["other_config"]
 
+        # Incremented on every change that should be saved, see `persistence.PersistenceManager`
+        self.version: int = 0
+
         # self.is_publishing_enabled = True
         # self.publish_address = "http://filipgrzymski.com/data/"
         # self.publish_period_ms = 10000 
@@ -178,55 +253,86 @@ class AppConfig():
             "other_config": self.other_config,
             "wifi_config": self.wifi_config,
             "modbus_config": self.modbus_config,
-            "channel_config": self.channel_config
+            "channel_config": [channel.asdict() for channel in self.channel_config]
         }
 
     def asjson(self) -> str:
+        # Channel dicts are built by `asdict()`, so changing them leaves AppConfig state intact
         data = self.asdict()
-        for i, channel in enumerate(data["channel_config"]):
-            if len(channel) > 0:
-                probe = channel["probe"]
-                data["channel_config"][i]["probe"] = __DeviceConfig.SENSORS_AS_TEXT[probe]
+        for channel in data["channel_config"]:
+            channel["probe"] = __DeviceConfig.SENSORS_AS_TEXT[channel["probe"]]
+
+        return json.dumps(data)
 
-        json_str = json.dumps(data)
+    def mark_dirty(self) -> None:
+        self.version += 1
 
-        # Reverse the operation, because it alters AppConfig state,
-        # A deep copy should be used here, but the implementation is not available in stock micropython
+    def serialize(self) -> str:
         data = self.asdict()
-        for i, channel in enumerate(data["channel_config"]):
-            if len(channel) > 0:
-                probe = channel["probe"]
-                data["channel_config"][i]["probe"] = __DeviceConfig.TEXT_AS_SENSOR[probe]
-        
-        return json_str 
+        for channel in data["channel_config"]:
+            channel["probe"] = __DeviceConfig.SENSORS_AS_TEXT[channel["probe"]]
+
+        attrs = {
+            "info": {
+                "NAME": __DeviceConfig.APP_NAME,
+                "VERSION": __DeviceConfig.APP_VERSION,
+            },
+            "data": data,
+        }
+
+        return json.dumps(attrs)
 
-    def save_to_file(self, filename: str="") -> None:
+    def save_to_file(self, filename: str="", image_filename: str="") -> int:
         if len(filename) < 1:
             filename = self.SAVE_FILE_FILENAME
+        if len(image_filename) < 1:
+            image_filename = self.IMAGE_FILE_FILENAME
 
-        data = self.asdict()
-        for i, channel in enumerate(data["channel_config"]):
-            probe = channel["probe"]
-            data["channel_config"][i]["probe"] = __DeviceConfig.SENSORS_AS_TEXT[probe]
+        json_str = self.serialize()
 
-        with open(filename, "w", encoding="UTF-8") as f:
-            attrs = {
-                "info": {
-                    "NAME": __DeviceConfig.APP_NAME,
-                    "VERSION": __DeviceConfig.APP_VERSION,
-                },
-                "data": data,
-            }
+        payload = None
+        if self.other_config["config_image_enabled"]:
+            try:
+                payload = config_image.encode_payload(self.asdict())
+            except ValueError as e:
+                # Boot falls back to the JSON file
+                if self.other_config["debug_enabled"]:
+                    print(f"Config image not written, exception: {e}")
 
-            json.dump(attrs, f)
+                config_image.remove_image(image_filename)
 
+        num_of_bytes = persistence.write_atomic(filename, json_str)
 
-        # Reverse the operation, because it alters AppConfig state,
-        # A deep copy should be used here, but the implementation is not available in stock micropython
-        data = self.asdict()
-        for i, channel in enumerate(data["channel_config"]):
-            probe = channel["probe"]
-            data["channel_config"][i]["probe"] = __DeviceConfig.TEXT_AS_SENSOR[probe]
+        json_stamp = config_image.get_file_stamp(filename)
+        if payload is not None and json_stamp is not None:
+            # Written after the JSON, so the size and time it holds match the file on flash
+            num_of_bytes += persistence.write_atomic(image_filename, config_image.build_image(payload, json_stamp))
+
+        return num_of_bytes
+
+    def load(self, filename: str="", image_filename: str="") -> bool:
+        # Returns True if the config came from the binary image, False if from JSON
+        if len(filename) < 1:
+            filename = self.SAVE_FILE_FILENAME
+        if len(image_filename) < 1:
+            image_filename = self.IMAGE_FILE_FILENAME
+
+        try:
+            data = config_image.read_image(image_filename, filename)
+        except Exception:
+            data = None
+
+        if data is not None:
+            self.load_from_dict(data)
+            return True
+
+        self.load_from_json(filename)
+
+        if self.other_config["config_image_enabled"]:
+            # Image is missing or stale, write a fresh one
+            self.mark_dirty()
+
+        return False
 
     def load_from_json(self, filename: str="") -> None:
         if len(filename) < 1:
@@ -241,8 +347,30 @@ class AppConfig():
             probe = channel["probe"]
             data["channel_config"][i]["probe"] = __DeviceConfig.TEXT_AS_SENSOR[probe]
 
+        self.load_from_dict(data)
+
+    def load_from_dict(self, data: dict) -> None:
+        self.fill_missing_defaults(data)
+
+        # Validated before anything is replaced, so a bad file leaves the current config in place
+        channel_config = [ChannelConfig(channel) for channel in data["channel_config"]]
 
         self.other_config = data["other_config"]
         self.wifi_config = data["wifi_config"]
         self.modbus_config = data["modbus_config"]
-        self.channel_config = data["channel_config"]
\ No newline at end of file
+        self.channel_config = channel_config
+
+    def fill_missing_defaults(self, data: dict) -> None:
+        # Files saved by older firmware versions may lack some keys
+        d = self.DEFAULTS
+
+        for key in ("other_config", "wifi_config", "modbus_config"):
+            for attr, value in d[key].items():
+                data[key].setdefault(attr, value)
+
+        for i, channel in enumerate(data["channel_config"]):
+            if i >= len(d["channel_config"]):
+                break
+
+            for attr, value in d["channel_config"][i].items():
+                channel.setdefault(attr, value)
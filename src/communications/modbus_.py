@@ -2,6 +2,7 @@ from umodbus.serial import ModbusRTU # type: ignore
 from math import modf
 
 import app
+from measurements import results
 from device_config import __DeviceConfig
 
 
@@ -34,6 +35,13 @@ class ModbusController():
         except Exception as e:
             return False
 
+    def is_frame_in_progress(self) -> bool:
+        # Bytes waiting in the UART are the start of a request, which has to be answered before the master times out
+        try:
+            return self.client._itf._uart.any() > 0
+        except AttributeError:
+            return False
+
     def update_registers(self) -> None:
         
         vals = []
@@ -42,6 +50,15 @@ class ModbusController():
 
             try:
                 reading = self.app_state.measurement_results[global_channel_id]
+
+                if isinstance(reading, results.ChannelResult):
+                    # Fixed-point result already holds whole and fractional parts exactly
+                    temp_mC = reading.temperature_mC
+                    whole_number = abs(temp_mC) // 1000
+                    vals.append(-whole_number if temp_mC < 0 else whole_number)
+                    vals.append((abs(temp_mC) % 1000) * 10)
+                    continue
+
                 temp_C = reading["temperature_C"]
 
             except Exception:
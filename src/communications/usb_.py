@@ -1,11 +1,17 @@
 import select
 import sys
+import json
 import machine
+import uasyncio as asyncio
+
+import profiler
 
 
 from app import AppState, AppConfig
 from device_config import __DeviceConfig
 import measurements.sensors
+import measurements.filters
+import measurements.channel_config
 
 
 class Command():
@@ -37,7 +43,7 @@ class USBController():
     COMMAND_DELIMITER: str = ';'
     RESPONSE_DELIMITER: str = '_@_'
     
-    VALID_COMMAND_TYPES: set[str] = {"WC", "RS", "RM", "RC", "RT"}
+    VALID_COMMAND_TYPES: set[str] = {"WC", "RS", "RM", "RC", "RT", "RH", "RL", "RP"}
     CHANNEL_SPECIFIERS = __DeviceConfig.USB_CHANNEL_SPECIFIERS
     VALID_CHANNEL_SPECIFIERS: set = set(CHANNEL_SPECIFIERS.keys())
     VALID_COMMAND_ARG1: set[str] = {"", "MB", "WF", "OT"}.union(VALID_CHANNEL_SPECIFIERS)
@@ -45,9 +51,13 @@ class USBController():
                                "VN", "EN", "PB", "NM", "TM", "NS",
                                "AD", "BR", "DB", "SB", "PR",
                                "EN", "SS", "PW",
-                               "DB"
+                               "DB", "CM", "AP", "FL", "FP",
+                               "FR", "MN", "HR", "LG", "CI", "DC", "PF"
     }
 
+    # Most history records returned by a single `RH` command
+    HISTORY_PAGE_LIMIT: int = 64
+
 
     def __init__(self, app_state: AppState, app_config: AppConfig) -> None:
 
@@ -60,6 +70,30 @@ class USBController():
     def run(self) -> bool:
         msg = self.listen()
 
+        return self.respond(msg)
+
+    async def serve(self) -> None:
+        # Task counterpart of `run()`, the task sleeps until stdin has a line instead of polling it
+        reader = asyncio.StreamReader(sys.stdin.buffer)
+
+        while True:
+            line = await reader.readline()
+
+            try:
+                msg = line.decode()[:self.LISTEN_CHAR_LIMIT].strip()
+            except UnicodeError:
+                continue
+
+            loop_profiler = self.app_state.profiler
+            if loop_profiler:
+                loop_profiler.begin(profiler.STAGE_USB)
+
+            self.respond(msg)
+
+            if loop_profiler:
+                loop_profiler.end(profiler.STAGE_USB)
+
+    def respond(self, msg: str|None) -> bool:
         if not msg:
             return False
 
@@ -143,11 +177,95 @@ class USBController():
         elif command.type == "RM":
             return (True, str(self.app_state.measurements_asjson()))
 
+        elif command.type == "RH":
+            return self.execute_RH(command)
+
+        elif command.type == "RL":
+            return self.execute_RL(command)
+
+        elif command.type == "RP":
+            return self.execute_RP(command)
+
         elif command.type == "RT":
+            # Pending writes would be lost on reset
+            if self.app_state.persistence_manager:
+                self.app_state.persistence_manager.flush()
+            if self.app_state.measurement_logger:
+                self.app_state.measurement_logger.flush()
             machine.reset()
 
         raise NotImplementedError("Provided type `{command.type}` is not implemented, this error signifies that command was incorrectly validated")
     
+    def execute_RH(self, command: Command) -> tuple[bool, str|None]:
+        # RH;<channel>;<FR|MN|HR>;<offset>,<count> reads history newest first, `offset` skips the newest records
+        assert command.type == "RH"
+
+        history = self.app_state.measurement_history
+        if history is None:
+            return (False, "Measurement history is not available")
+
+        if command.arg1 not in self.VALID_CHANNEL_SPECIFIERS:
+            return (False, f"Invalid channel `{command.arg1}`, not in `{self.VALID_CHANNEL_SPECIFIERS}`")
+
+        if command.arg2 not in history.TIERS:
+            return (False, f"Invalid history tier `{command.arg2}`, not in `{history.TIERS}`")
+
+        try:
+            offset, count = [int(v) for v in command.val.split(",")]
+        except ValueError:
+            return (False, f"Value must be `offset,count`, not `{command.val}`")
+
+        if offset < 0 or not (1 <= count <= self.HISTORY_PAGE_LIMIT):
+            return (False, f"Offset must be non-negative and count in range 1-{self.HISTORY_PAGE_LIMIT}, not `{offset}`, `{count}`")
+
+        global_channel_id = self.CHANNEL_SPECIFIERS[command.arg1]
+
+        data = {
+            "channel": command.arg1,
+            "tier": command.arg2,
+            "total": history.count(global_channel_id, command.arg2),
+            "offset": offset,
+            "records": history.read(global_channel_id, command.arg2, offset, count),
+        }
+
+        return (True, json.dumps(data))
+
+    def execute_RL(self, command: Command) -> tuple[bool, str|None]:
+        # RL;;;<offset>,<count> decodes the binary measurement log newest first
+        assert command.type == "RL"
+
+        logger = self.app_state.measurement_logger
+        if logger is None:
+            return (False, "Measurement log is not available")
+
+        try:
+            offset, count = [int(v) for v in command.val.split(",")]
+        except ValueError:
+            return (False, f"Value must be `offset,count`, not `{command.val}`")
+
+        if offset < 0 or not (1 <= count <= self.HISTORY_PAGE_LIMIT):
+            return (False, f"Offset must be non-negative and count in range 1-{self.HISTORY_PAGE_LIMIT}, not `{offset}`, `{count}`")
+
+        return (True, logger.page_asjson(offset, count))
+
+    def execute_RP(self, command: Command) -> tuple[bool, str|None]:
+        # RP;;; reads per-stage timings, RP;;;reset reads and clears them
+        assert command.type == "RP"
+
+        loop_profiler = self.app_state.profiler
+        if loop_profiler is None:
+            return (False, "Profiler is not available")
+
+        if command.val not in ("", "reset"):
+            return (False, f"Value must be empty or `reset`, not `{command.val}`")
+
+        response = loop_profiler.asjson()
+
+        if command.val == "reset":
+            loop_profiler.reset()
+
+        return (True, response)
+
     def execute_WC(self, command: Command) -> tuple[bool, str|None]:
         assert command.type == "WC"
         error = None
@@ -161,46 +279,72 @@ class USBController():
             id = global_channel_id
 
             if command.arg2 == "VN":
-                a.channel_config[id]["verbose_name"] = command.val
+                a.channel_config[id].verbose_name = command.val
                 
             elif command.arg2 == "EN":
                 if command.val in ["True", "true", "1"]:
-                    a.channel_config[id]["is_enabled"] = True
+                    a.channel_config[id].is_enabled = True
                 elif command.val in ["False", "false", "0"]:
-                    a.channel_config[id]["is_enabled"] = False
+                    a.channel_config[id].is_enabled = False
                 else:
                     error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
 
             elif command.arg2 == "PB":
                 if command.val in ["Pt100", "pt100"] and measurements.sensors.SensorPt100 in __DeviceConfig.ALLOWED_PROBES_TYPES:
-                    a.channel_config[id]["probe"] = measurements.sensors.SensorPt100
+                    a.channel_config[id].probe = measurements.sensors.SensorPt100
                 elif command.val in ["Pt1000", "pt1000"] and measurements.sensors.SensorPt1000 in __DeviceConfig.ALLOWED_PROBES_TYPES:
-                    a.channel_config[id]["probe"] = measurements.sensors.SensorPt1000
+                    a.channel_config[id].probe = measurements.sensors.SensorPt1000
                 elif command.val in ["NTC", "ntc"] and measurements.sensors.SensorNTC in __DeviceConfig.ALLOWED_PROBES_TYPES:
-                    a.channel_config[id]["probe"] = measurements.sensors.SensorNTC
+                    a.channel_config[id].probe = measurements.sensors.SensorNTC
                 else:
                     error = f"Invalid probe type `{command.val}`"
 
 
+            elif command.arg2 == "AP":
+                if command.val in __DeviceConfig.ALLOWED_ACQUISITION_PROFILES:
+                    a.channel_config[id].acquisition_profile = command.val
+                else:
+                    error = f"Invalid acquisition profile `{command.val}`, not in `{__DeviceConfig.ALLOWED_ACQUISITION_PROFILES}`"
+
+            elif command.arg2 == "FL":
+                try:
+                    a.channel_config[id].filters = measurements.filters.parse_filter_specs(command.val)
+                except ValueError as e:
+                    error = f"Invalid filters `{command.val}`, {e}"
+
             elif command.arg2 == "TM":
                 try:
                     time = int(command.val)
 
-                    if time >= 0:
-                        a.channel_config[global_channel_id]["time_between_measurements_ms"] = time
+                    max_time = measurements.channel_config.MAX_TIME_BETWEEN_MEASUREMENTS_MS
+
+                    if time >= 0 and time <= max_time:
+                        a.channel_config[global_channel_id].time_between_measurements_ms = time
                     else:
-                        error = f"Time between measurements must be non-negative, not {time}" 
+                        error = f"Time between measurements must be in range 0-{max_time}, not {time}" 
                     
                 except ValueError:
                     error = f"Time between measurements must be an integer, not {command.val}" 
 
 
+            elif command.arg2 == "NM":
+                try:
+                    num = int(command.val)
+
+                    if num > 0 and num < 65:
+                        a.channel_config[global_channel_id].num_readings_per_measurement = num
+                    else:
+                        error = f"Number of readings per measurement must be positive and lower than 65, not {num}" 
+                    
+                except ValueError:
+                    error = f"Number of readings per measurement must be an integer, not {command.val}" 
+
             elif command.arg2 == "NS":
                 try:
                     num = int(command.val)
 
                     if num > 0 and num < 2049:
-                        a.channel_config[global_channel_id]["num_of_readings_to_store"] = num
+                        a.channel_config[global_channel_id].num_of_readings_to_store = num
                     else:
                         error = f"Number of readings to store must be positive and lower than 2049, not {num}" 
                     
@@ -303,13 +447,62 @@ class USBController():
                 else:
                     error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
 
+            elif command.arg2 == "CM":
+                if command.val in ["True", "true", "1"]:
+                    a.other_config["continuous_mode_enabled"] = True
+                elif command.val in ["False", "false", "0"]:
+                    a.other_config["continuous_mode_enabled"] = False
+                else:
+                    error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
+
+            elif command.arg2 == "FP":
+                if command.val in ["True", "true", "1"]:
+                    a.other_config["fixed_point_enabled"] = True
+                elif command.val in ["False", "false", "0"]:
+                    a.other_config["fixed_point_enabled"] = False
+                else:
+                    error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
+
+            elif command.arg2 == "LG":
+                if command.val in ["True", "true", "1"]:
+                    a.other_config["logging_enabled"] = True
+                elif command.val in ["False", "false", "0"]:
+                    a.other_config["logging_enabled"] = False
+                else:
+                    error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
+
+            elif command.arg2 == "CI":
+                if command.val in ["True", "true", "1"]:
+                    a.other_config["config_image_enabled"] = True
+                elif command.val in ["False", "false", "0"]:
+                    a.other_config["config_image_enabled"] = False
+                else:
+                    error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
+
+            elif command.arg2 == "DC":
+                if command.val in ["True", "true", "1"]:
+                    a.other_config["dual_core_enabled"] = True
+                elif command.val in ["False", "false", "0"]:
+                    a.other_config["dual_core_enabled"] = False
+                else:
+                    error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
+
+            elif command.arg2 == "PF":
+                if command.val in ["True", "true", "1"]:
+                    a.other_config["profiling_enabled"] = True
+                elif command.val in ["False", "false", "0"]:
+                    a.other_config["profiling_enabled"] = False
+                else:
+                    error = f"Value must either True/true/1 or False/false/0, not `{command.val}`"
+
             else:
                 error = f"Incorrect register address: {command.arg1}, {command.arg2}"
 
         if error:
             return (False, error)
         else:
-            self.app_config.save_to_file()
+            # Saved by the persistence manager once writes settle down
+            self.app_config.mark_dirty()
             return (True, "Register updated")
 
     def get_response(self, command_str: str, is_successful: bool, payload: str|None) -> str:
@@ -0,0 +1,212 @@
+import os
+import struct
+
+from device_config import __DeviceConfig
+
+try:
+    from binascii import crc32
+except ImportError:
+    crc32 = None
+
+
+# Binary mirror of the JSON config, read at boot with a single file read and no text parsing.
+# Layout: header followed by a tagged, length-prefixed encoding of `AppConfig.asdict()`
+MAGIC = b"PM1C"
+FORMAT_VERSION = 2
+
+# magic, format version, payload length, payload checksum, size and modification time of the JSON file written alongside.
+# The JSON file is only stat-ed at boot, so replacing it behind the image is noticed without reading it
+HEADER_FORMAT = "<4sHIIII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+TAG_NONE = 0
+TAG_FALSE = 1
+TAG_TRUE = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_STR = 5
+TAG_LIST = 6
+TAG_TUPLE = 7
+TAG_DICT = 8
+TAG_PROBE = 9
+TAG_INT64 = 10
+
+INT32_MIN = -(1 << 31)
+INT32_MAX = (1 << 31) - 1
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+
+
+def checksum(data) -> int:
+    if crc32 is not None:
+        return crc32(data) & 0xFFFFFFFF
+
+    # Bitwise CRC-32, same result as binascii.crc32 for firmware builds without it
+    crc = 0xFFFFFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 1:
+                crc = (crc >> 1) ^ 0xEDB88320
+            else:
+                crc >>= 1
+
+    return crc ^ 0xFFFFFFFF
+
+
+def encode_value(value, parts: list) -> None:
+    if value is None:
+        parts.append(bytes((TAG_NONE,)))
+    elif value is True:
+        parts.append(bytes((TAG_TRUE,)))
+    elif value is False:
+        parts.append(bytes((TAG_FALSE,)))
+    elif isinstance(value, int):
+        if INT32_MIN <= value <= INT32_MAX:
+            parts.append(struct.pack("<Bi", TAG_INT, value))
+        elif INT64_MIN <= value <= INT64_MAX:
+            parts.append(struct.pack("<Bq", TAG_INT64, value))
+        else:
+            raise ValueError(f"Integer {value} cannot be stored in the config image")
+    elif isinstance(value, float):
+        parts.append(struct.pack("<Bd", TAG_FLOAT, value))
+    elif isinstance(value, str):
+        encoded = value.encode("UTF-8")
+        parts.append(struct.pack("<BH", TAG_STR, len(encoded)))
+        parts.append(encoded)
+    elif isinstance(value, (list, tuple)):
+        tag = TAG_TUPLE if isinstance(value, tuple) else TAG_LIST
+        parts.append(struct.pack("<BH", tag, len(value)))
+        for item in value:
+            encode_value(item, parts)
+    elif isinstance(value, dict):
+        parts.append(struct.pack("<BH", TAG_DICT, len(value)))
+        for key, item in value.items():
+            encoded = key.encode("UTF-8")
+            parts.append(struct.pack("<B", len(encoded)))
+            parts.append(encoded)
+            encode_value(item, parts)
+    elif value in __DeviceConfig.SENSORS_AS_TEXT:
+        encoded = __DeviceConfig.SENSORS_AS_TEXT[value].encode("UTF-8")
+        parts.append(struct.pack("<BB", TAG_PROBE, len(encoded)))
+        parts.append(encoded)
+    else:
+        raise ValueError(f"Value of type `{type(value)}` cannot be stored in the config image")
+
+
+def decode_value(buf, offset: int) -> tuple:
+    tag = buf[offset]
+    offset += 1
+
+    if tag == TAG_NONE:
+        return None, offset
+    elif tag == TAG_TRUE:
+        return True, offset
+    elif tag == TAG_FALSE:
+        return False, offset
+    elif tag == TAG_INT:
+        return struct.unpack_from("<i", buf, offset)[0], offset + 4
+    elif tag == TAG_INT64:
+        return struct.unpack_from("<q", buf, offset)[0], offset + 8
+    elif tag == TAG_FLOAT:
+        return struct.unpack_from("<d", buf, offset)[0], offset + 8
+    elif tag == TAG_STR:
+        length = struct.unpack_from("<H", buf, offset)[0]
+        offset += 2
+        return str(buf[offset:offset + length], "UTF-8"), offset + length
+    elif tag == TAG_LIST or tag == TAG_TUPLE:
+        length = struct.unpack_from("<H", buf, offset)[0]
+        offset += 2
+        items = []
+        for _ in range(length):
+            item, offset = decode_value(buf, offset)
+            items.append(item)
+        if tag == TAG_TUPLE:
+            return tuple(items), offset
+        return items, offset
+    elif tag == TAG_DICT:
+        length = struct.unpack_from("<H", buf, offset)[0]
+        offset += 2
+        d = {}
+        for _ in range(length):
+            key_length = buf[offset]
+            offset += 1
+            key = str(buf[offset:offset + key_length], "UTF-8")
+            offset += key_length
+            d[key], offset = decode_value(buf, offset)
+        return d, offset
+    elif tag == TAG_PROBE:
+        length = buf[offset]
+        offset += 1
+        probe = __DeviceConfig.TEXT_AS_SENSOR[str(buf[offset:offset + length], "UTF-8")]
+        return probe, offset + length
+    else:
+        raise ValueError(f"Unknown tag `{tag}` at offset {offset - 1}")
+
+
+def encode_payload(data: dict) -> bytes:
+    # Raises ValueError for values the image cannot hold, nothing has been written at that point
+    parts = []
+    encode_value(data, parts)
+
+    return b"".join(parts)
+
+
+def get_file_stamp(filename: str) -> tuple[int, int]|None:
+    # (size, modification time) of a file, None if it does not exist
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+
+    return stat[6], int(stat[8]) & 0xFFFFFFFF
+
+
+def remove_image(filename: str) -> None:
+    try:
+        os.remove(filename)
+    except OSError:
+        pass
+
+
+def build_image(payload: bytes, json_stamp: tuple[int, int]) -> bytes:
+    json_size, json_mtime = json_stamp
+    header = struct.pack(HEADER_FORMAT, MAGIC, FORMAT_VERSION, len(payload), checksum(payload), json_size, json_mtime)
+
+    return header + payload
+
+
+def parse_image(image, json_stamp: tuple[int, int]|None=None) -> dict|None:
+    # Returns None when the image is damaged, from another format version or
+    # older than the JSON file it mirrors, the caller then falls back to JSON
+    if len(image) < HEADER_SIZE:
+        return None
+
+    magic, version, length, payload_checksum, json_size, json_mtime = struct.unpack_from(HEADER_FORMAT, image, 0)
+
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+
+    if json_stamp is not None and json_stamp != (json_size, json_mtime):
+        return None
+
+    payload = memoryview(image)[HEADER_SIZE:]
+    if len(payload) != length or checksum(payload) != payload_checksum:
+        return None
+
+    data, _ = decode_value(payload, 0)
+
+    return data
+
+
+def read_image(filename: str, json_filename: str|None=None) -> dict|None:
+    try:
+        with open(filename, "rb") as f:
+            image = f.read()
+    except OSError:
+        return None
+
+    # The JSON file is only stat-ed, not read, to tell whether it was replaced behind the image
+    json_stamp = get_file_stamp(json_filename) if json_filename else None
+
+    return parse_image(image, json_stamp)
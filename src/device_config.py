@@ -20,9 +20,37 @@ class __DeviceConfig():
     
     NUM_OF_CHANNELS: int = 3
     NUM_OF_ADCs: int = 1
+
+    # Global channel id -> (adc_id, adc_channel_id), adc_id is the ADC position in `MeasurementController.ADCs`
+    CHANNEL_ROUTING: tuple[tuple[int, int], ...] = ((0, 0), (0, 1), (0, 2))
     ADS124S08_1_RRef: float = 2000
 
-    ALLOWED_PROBES_TYPES: set = {sensors.SensorPt100, sensors.SensorPt1000}
+    # Records kept per channel by `MeasurementHistory`, about 4.6 kB per channel
+    HISTORY_FULL_RATE_SIZE: int = 240
+    HISTORY_MINUTES_SIZE: int = 120
+    HISTORY_HOURS_SIZE: int = 48
+
+    # Binary measurement log, 8 segments of 64 kB hold 32768 records
+    LOG_DIRECTORY: str = "logs"
+    LOG_SEGMENT_SIZE: int = 65536
+    LOG_MAX_SEGMENTS: int = 8
+
+    # Config is saved once USB writes settle down, state is a periodic snapshot
+    CONFIG_SAVE_DEBOUNCE_MS: int = 2000
+    CONFIG_SAVE_MAX_DELAY_MS: int = 30000
+    STATE_SAVE_INTERVAL_MS: int = 60000
+
+    # Garbage collection, see `memory.MemoryPolicy`
+    GC_THRESHOLD_BYTES: int = 32768
+    GC_COLLECT_AFTER_BYTES: int = 8192
+    GC_MAX_INTERVAL_MS: int = 5000
+    GC_LOW_MEMORY_BYTES: int = 16384
+    GC_FRAGMENTATION_INTERVAL_MS: int = 60000
+
+    ALLOWED_PROBES_TYPES: set = {sensors.SensorPt100, sensors.SensorPt1000, sensors.SensorNTC}
+
+    # Names of ADS124S08_ADC.ACQUISITION_PROFILES, trading resolution for response time
+    ALLOWED_ACQUISITION_PROFILES: set = {"precision", "default", "balanced", "fast", "fast_sinc3"}
 
     USB_CHANNEL_SPECIFIERS: dict[str, int] = {"C0": 0, "C1": 1, "C2": 2}
 
@@ -57,16 +85,20 @@ class __DeviceConfig():
 
     LED1_PIN_ID: int = 14
 
+    @staticmethod
+    def get_gain_ADS124S08(probe: type[sensors.SensorProbe]) -> int:
+        if probe == sensors.SensorPt100:
+            return 16
+        elif probe == sensors.SensorPt1000:
+            return 2
+        else:
+            return 1
+
     @classmethod
     def calculate_resistance_ADS124S08(cls, reading: float, probe: type[sensors.SensorProbe], calibration: tuple):
         assert len(calibration) == 2
 
-        if probe == sensors.SensorPt100:
-            gain = 16
-        elif probe == sensors.SensorPt1000:
-            gain = 2
-        else:
-            gain = 1
+        gain = cls.get_gain_ADS124S08(probe)
 
         RRef_offset = calibration[0]
         R_offset = calibration[1]
@@ -79,3 +111,13 @@ class __DeviceConfig():
 
         return R
 
+    @classmethod
+    def calculate_reading_ADS124S08(cls, resistance: float, probe: type[sensors.SensorProbe], calibration: tuple) -> float:
+        # Inverse of `calculate_resistance_ADS124S08`
+        assert len(calibration) == 2
+
+        gain = cls.get_gain_ADS124S08(probe)
+
+        RRef = cls.ADS124S08_1_RRef + calibration[0]
+
+        return (resistance - calibration[1]) * (gain * 2**22) / RRef
@@ -3,6 +3,7 @@ from machine import Pin, WDT, reset
 import utime
 
 import app
+import persistence
 from device_config import __DeviceConfig, DeviceMode, NormalMode, EmergencyMode, ContinuousMode
 from initialization import emode
 
@@ -34,12 +35,30 @@ def initialize_device(app_state: app.AppState, app_config: app.AppConfig) -> tup
     else:
         wdt = None
 
+    # Registered before loading, so versions marked dirty by `load()` are saved
+    persistence_manager = persistence.PersistenceManager()
+    persistence_manager.register(
+        "config",
+        app_config,
+        debounce_ms=__DeviceConfig.CONFIG_SAVE_DEBOUNCE_MS,
+        max_delay_ms=__DeviceConfig.CONFIG_SAVE_MAX_DELAY_MS,
+    )
+    persistence_manager.register(
+        "state",
+        app_state,
+        min_interval_ms=__DeviceConfig.STATE_SAVE_INTERVAL_MS,
+    )
+    app_state.persistence_manager = persistence_manager
+
     try:
-        app_config.load_from_json()
+        app_config.load()
     except Exception as e:
         if app_config.other_config["debug_enabled"]:
             print("Config loading failed, exception: {e}")
 
+        # Defaults are not on flash yet
+        app_config.mark_dirty()
+
 
     if app_config.other_config["debug_enabled"]:
         print("Device is running with debug enabled, which is only intended for troubleshooting. Use `WC;OT;DB;False` command to disable it.")
@@ -51,6 +70,7 @@ def initialize_device(app_state: app.AppState, app_config: app.AppConfig) -> tup
     led1.high()
 
     measurement_controller = m.initialize_measurements(app_state, app_config)
+    app_state.results_source = measurement_controller
 
     usb_controller, modbus_controller = c.initialize_communications(app_state, app_config)
 
@@ -79,11 +99,10 @@ def initialize_device(app_state: app.AppState, app_config: app.AppConfig) -> tup
         app_state.network_info = network_info
         app_state.wifi_ok = True
 
-        utime.sleep(0.2)
-        s = w.open_socket()
         utime.sleep(0.2)
 
-        web_server = w.WebServer(socket=s, app_state=app_state, app_config=app_config, usb_controller=usb_controller)
+        # Listening socket is opened by `WebServer.serve()` once the event loop runs
+        web_server = w.WebServer(app_state=app_state, app_config=app_config, usb_controller=usb_controller)
 
     else:
         app_state.wifi_ok = False
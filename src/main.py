@@ -1,11 +1,17 @@
 import initialization.device_init
+import sys
 import utime
+import uasyncio as asyncio
 # import ntptime
 from machine import Pin, WDT
 from gc import collect as gc_collect, mem_free as gc_mem_free
 
 import app
 import initialization
+import memory
+import profiler
+from measurements import dual_core
+from device_config import __DeviceConfig
 
 # import measurements.measurements as m
 # import communications.communications as c
@@ -20,59 +26,171 @@ objs = initialization.device_init.initialize_device(app_state, app_config)
 
 IO_pins, measurement_controller, usb_controller, modbus_controller, web_server, wdt = objs
 
+memory_policy = memory.MemoryPolicy(
+    threshold_bytes=__DeviceConfig.GC_THRESHOLD_BYTES,
+    collect_after_bytes=__DeviceConfig.GC_COLLECT_AFTER_BYTES,
+    max_interval_ms=__DeviceConfig.GC_MAX_INTERVAL_MS,
+    low_memory_bytes=__DeviceConfig.GC_LOW_MEMORY_BYTES,
+    fragmentation_interval_ms=__DeviceConfig.GC_FRAGMENTATION_INTERVAL_MS,
+)
+memory_policy.add_blocker(modbus_controller.is_frame_in_progress)
+app_state.memory_policy = memory_policy
+
+loop_profiler = profiler.LoopProfiler(enabled=app_config.other_config["profiling_enabled"])
+app_state.profiler = loop_profiler
+
+# Optional, measurements run on core 1 and this core only handles communication
+if app_config.other_config["dual_core_enabled"]:
+    acquisition_core = dual_core.AcquisitionCore(measurement_controller)
+    app_state.results_source = acquisition_core
+    memory_policy.add_probe_blocker(lambda: acquisition_core.is_running)
+else:
+    acquisition_core = None
+
 app_state.is_initialized = True
 
 if app_config.other_config["debug_enabled"]:
     print("Initialized")
 
 
-def main():
-
-    last_ticks_ms = 0
-    last_ticks_ms_2 = 0
+# Longest time the measurement task sleeps without checking the ADCs, DRDY events usually wake it sooner
+MEASUREMENT_MAX_WAIT_MS = 50
+MODBUS_POLL_INTERVAL_MS = 2
+RESULTS_POLL_INTERVAL_MS = 10
+STATUS_INTERVAL_MS = 250
+STATE_INTERVAL_MS = 10000
 
 
+async def measurement_task():
     while True:
-        
+        loop_profiler.begin(profiler.STAGE_MEASUREMENT)
         measurement_controller.run()
+        loop_profiler.end(profiler.STAGE_MEASUREMENT)
 
         app_state.measurement_results = measurement_controller.get_current_results()
 
-        usb_controller.run()
+        # Time the controller would sleep anyway, e.g. while a channel settles, is used for garbage collection
+        idle_ms, _ = measurement_controller.get_wait_ms(MEASUREMENT_MAX_WAIT_MS)
+        run_memory_policy(idle_ms)
+
+        await measurement_controller.wait_for_work(MEASUREMENT_MAX_WAIT_MS)
+
+
+async def results_task():
+    # Dual-core mode, picks up results and log records published by core 1
+    while True:
+        # Raising here stops the loop like a failed `measurement_task` would, so the WDT is no longer fed
+        acquisition_core.check()
+
+        # Measurements themselves run on core 1, this stage is only their pickup
+        loop_profiler.begin(profiler.STAGE_MEASUREMENT)
+        app_state.measurement_results = acquisition_core.get_current_results()
+        acquisition_core.drain_log(app_state.measurement_logger)
+        loop_profiler.end(profiler.STAGE_MEASUREMENT)
+
+        run_memory_policy(RESULTS_POLL_INTERVAL_MS)
 
+        await asyncio.sleep_ms(RESULTS_POLL_INTERVAL_MS)
+
+
+async def modbus_task():
+    # umodbus only polls the UART, it has no stream to await
+    while True:
+        loop_profiler.begin(profiler.STAGE_MODBUS)
         modbus_controller.run()
+        loop_profiler.end(profiler.STAGE_MODBUS)
+
+        await asyncio.sleep_ms(MODBUS_POLL_INTERVAL_MS)
+
+
+def run_memory_policy(idle_ms: int=0) -> None:
+    if memory_policy.run(idle_ms):
+        loop_profiler.record(profiler.STAGE_GC, memory_policy.last_pause_us)
+
+
+async def timer_task(interval_ms: int, job):
+    # Intervals are counted from the previous start, so a slow job does not shift the following ones
+    next_ticks_ms = utime.ticks_ms()
+
+    while True:
+        job()
+
+        next_ticks_ms = utime.ticks_add(next_ticks_ms, interval_ms)
+        delay_ms = utime.ticks_diff(next_ticks_ms, utime.ticks_ms())
+
+        if delay_ms < 0:
+            # Job overran a whole interval, start counting again from now
+            next_ticks_ms = utime.ticks_ms()
+            delay_ms = 0
+
+        await asyncio.sleep_ms(delay_ms)
+
+
+def status_job():
+    for led in IO_pins["signal_leds"]:
+        led.toggle()
+
+    # Collects only when idle windows did not come often enough
+    run_memory_policy()
+
+    app_state.free_memory = gc_mem_free()
+
+    if acquisition_core:
+        app_state.schedule_stats = acquisition_core.get_schedule_stats()
+
+        acquisition_core.configure(
+            fixed_point=app_config.other_config["fixed_point_enabled"],
+            logging_enabled=app_config.other_config["logging_enabled"],
+        )
+    else:
+        app_state.schedule_stats = measurement_controller.get_schedule_stats()
+
+        measurement_controller.refresh_config()
+        measurement_controller.continuous_mode = app_config.other_config["continuous_mode_enabled"]
+        measurement_controller.processor.fixed_point = app_config.other_config["fixed_point_enabled"]
+        measurement_controller.logging_enabled = app_config.other_config["logging_enabled"]
+
+    loop_profiler.enabled = app_config.other_config["profiling_enabled"]
+
+    loop_profiler.begin(profiler.STAGE_SAVE)
+    app_state.persistence_manager.run()
+    loop_profiler.end(profiler.STAGE_SAVE)
 
-        if web_server and app_state.wifi_ok:
-            web_server.run()
-        
-        gc_collect()
+    if wdt and not (acquisition_core and acquisition_core.failure):
+        wdt.feed()
 
-        if (utime.ticks_diff(utime.ticks_ms(), last_ticks_ms) > 250):
-            for led in IO_pins["signal_leds"]:
-                led.toggle()
-        
-            app_state.free_memory = gc_mem_free()
 
-            measurement_controller.config = app_config.channel_config
+def state_job():
+    if app_config.other_config["debug_enabled"]:
+        print(app_state.asdict())
 
-            last_ticks_ms = utime.ticks_ms()
+    app_state.time_utc = utime.gmtime()
+    app_state.mark_dirty()
 
-            if wdt:
-                wdt.feed()
 
-        if (utime.ticks_diff(utime.ticks_ms(), last_ticks_ms_2) > 10000):
-            
-            if app_config.other_config["debug_enabled"]:
-                print(app_state.asdict())
+def handle_task_exception(loop, context):
+    # A failed task would leave its subsystem dead while the rest keeps running,
+    # stopping the loop brings back the old behaviour of the whole program stopping (and the WDT resetting it)
+    sys.print_exception(context["exception"])
+    loop.stop()
 
-            app_state.time_utc = utime.gmtime()
 
-            last_ticks_ms_2 = utime.ticks_ms()
+async def main():
+    asyncio.get_event_loop().set_exception_handler(handle_task_exception)
 
-            app_state.save_to_file()
-            app_config.save_to_file()
+    if acquisition_core:
+        acquisition_core.start()
+        asyncio.create_task(results_task())
+    else:
+        asyncio.create_task(measurement_task())
+    asyncio.create_task(usb_controller.serve())
+    asyncio.create_task(modbus_task())
 
-main()
+    if web_server and app_state.wifi_ok:
+        asyncio.create_task(web_server.serve())
 
+    asyncio.create_task(timer_task(STATUS_INTERVAL_MS, status_job))
 
+    await timer_task(STATE_INTERVAL_MS, state_job)
 
+asyncio.run(main())
@@ -1,4 +1,7 @@
 from machine import Pin, SPI, ADC
+from array import array
+import micropython
+import uasyncio as asyncio
 import utime
 
 from measurements import channels as ch 
@@ -8,6 +11,14 @@ from measurements import queries as q
 
 
 class SimpleADC:
+    """
+    `measure(query)` is polled with the same query until it returns ADC_DATA_READY or ADC_REFUSE.
+    It always returns the ADC's own `response`, overwritten on every call, so polling allocates nothing
+    """
+
+    SUPPORTS_CONTINUOUS_MODE: bool = False
+    # Pipelining ADCs accept the next query with `queue_next()` while the current one is converting
+    SUPPORTS_PIPELINING: bool = False
 
     def __init__(self, ID: int, channels: tuple[ch.BaseChannel, ...], *args, **kwargs) -> None:
     
@@ -18,9 +29,18 @@ class SimpleADC:
 
         self.query_in_progress: q.MeasurementQuery | None = None
 
+        self.response = q.MeasurementResponse()
+
+        # Set by ADCs with a data ready signal, the measurement task awaits it instead of polling
+        self.drdy_flag: asyncio.ThreadSafeFlag | None = None
 
     def measure(self, query: q.MeasurementQuery) -> q.MeasurementResponse:
         raise NotImplementedError
+
+    def get_wait_ms(self) -> int | None:
+        # Time until `measure()` should be called again for the query in progress,
+        # None means only a `drdy_flag` event can move it on
+        return 0
             
 
 class OnBoardADC(SimpleADC):   
@@ -102,6 +122,15 @@ class ADS1148_ADC(SPI_ADC):
         self.START = Pin(start_pin_id, Pin.OUT)
         self.RESET = Pin(reset_pin_id, Pin.OUT) 
         self.DRDY_pin = Pin(20, Pin.IN)     
+
+        # Single reading per query, filled by `measure_into` so a conversion allocates nothing
+        self.readings = array("l", (0,))
+
+        # WREG messages of every (channel, chopped) combination, so configuring allocates nothing
+        self._configuration_messages = tuple(
+            (self.compile_configuration(self.get_configuration(channel_id), False), self.compile_configuration(self.get_configuration(channel_id), True))
+            for channel_id in range(len(channels))
+        )
         
 
     def perform_initialization(self) -> None:
@@ -156,10 +185,10 @@ class ADS1148_ADC(SPI_ADC):
             channel.initialize(self.spi, self.CS_pin_id, self.CS_ACTIVE)
 
     def perform_configuration(self, configuration: dict, chopped: bool=False):
-        c = configuration
+        self.write_configuration(self.compile_configuration(configuration, chopped))
 
-        self.CS.value(self.CS_ACTIVE)
-        utime.sleep_us(1)
+    def compile_configuration(self, configuration: dict, chopped: bool=False) -> tuple[bytearray, bytearray, bytearray]:
+        c = configuration
 
         #WREG START
         msg = bytearray()
@@ -174,9 +203,7 @@ class ADS1148_ADC(SPI_ADC):
         msg.append(c["MUX1"])
         #SYS0
         msg.append(c["SYS0"])
-        self.spi.write(msg)
-
-        utime.sleep_ms(5)
+        mux_msg = msg
 
         #WREG START
 
@@ -194,26 +221,34 @@ class ADS1148_ADC(SPI_ADC):
             msg.append(c["!IDAC1"])
         else:
             msg.append(c["IDAC1"])
-
-        self.spi.write(msg)
+        idac_msg = msg
         #WREG END
 
        # SYNC    
         msg = bytearray()
         msg.append(0x04)
-        self.spi.write(msg)
+        sync_msg = msg
+
+        return (mux_msg, idac_msg, sync_msg)
+
+    def write_configuration(self, messages: tuple[bytearray, bytearray, bytearray]) -> None:
+        mux_msg, idac_msg, sync_msg = messages
+
+        self.CS.value(self.CS_ACTIVE)
+        utime.sleep_us(1)
+
+        self.spi.write(mux_msg)
+
+        utime.sleep_ms(5)
+
+        self.spi.write(idac_msg)
+        self.spi.write(sync_msg)
 
         self.CS.value(not self.CS_ACTIVE)
         utime.sleep_us(5)
         
 
-    def measure_channel(self, channel_id: int) -> list[int]:
-        channel = self.channels[channel_id]
-
-        reading = channel.measure() 
-        return reading
-        
-    def configure(self, channel_id: int, chopped: bool=False) -> None:
+    def get_configuration(self, channel_id: int) -> dict:
             
         # TODO make better
         c = {}
@@ -224,7 +259,10 @@ class ADS1148_ADC(SPI_ADC):
         elif channel_id == 1:
             c.update(self.configuration2)
 
-        self.perform_configuration(configuration=c, chopped=chopped)
+        return c
+
+    def configure(self, channel_id: int, chopped: bool=False) -> None:
+        self.write_configuration(self._configuration_messages[channel_id][1 if chopped else 0])
 
 
 
@@ -233,11 +271,7 @@ class ADS1148_ADC(SPI_ADC):
         perform_chopping = bool(query.extra_attrs.get("chopped"))
 
         if query.num_of_readings > 1:
-            return q.MeasurementResponse(
-                query_in_progress=None,
-                status=q.ADC_REFUSE,
-                message="ADS1148_ADC currently does not support taking multiple readings in bulk",
-            )
+            return self.response.set(None, q.ADC_REFUSE, None, 0, "ADS1148_ADC currently does not support taking multiple readings in bulk")
 
 
         if (not self.is_waiting_for_conversion):
@@ -246,39 +280,57 @@ class ADS1148_ADC(SPI_ADC):
 
             self.configure(query.adc_channel_id, chopped=perform_chopping)
 
-            return q.MeasurementResponse(
-                query_in_progress=self.query_in_progress,
-                status=q.ADC_ACCEPT,
-            )
+            return self.response.set(self.query_in_progress, q.ADC_ACCEPT)
 
         assert self.query_in_progress is not None
 
         if (self.DRDY_pin.value() == 0):
-            readings = self.measure_channel(self.query_in_progress.adc_channel_id)
+            channel = self.channels[self.query_in_progress.adc_channel_id]
+            count = channel.measure_into(self.readings, 1)
 
-            response = q.MeasurementResponse(
-                query_in_progress=self.query_in_progress,
-                status=q.ADC_DATA_READY,
-                readings=readings,
-            )
+            response = self.response.set(self.query_in_progress, q.ADC_DATA_READY, self.readings, count)
             self.is_waiting_for_conversion = False
             self.query_in_progress = None
 
             return response
         
 
-        return q.MeasurementResponse(
-            query_in_progress=self.query_in_progress,
-            status=q.ADC_WAITING_FOR_CONVERSION,
-        )
+        return self.response.set(self.query_in_progress, q.ADC_WAITING_FOR_CONVERSION)
 
 class MCP3204_ADC(SPI_ADC):
-    pass
+    # SAR converter, the conversion happens during the SPI transaction, so there is nothing to wait for
+    MAX_READINGS_PER_BURST = 64
+
+    def __init__(self, ID: int, channels: tuple[ch.MCP3204BaseChannel, ...], *args, **kwargs) -> None:
+        super().__init__(ID, channels, *args, **kwargs)
 
+        self.channels: tuple[ch.MCP3204BaseChannel, ...]
 
+        self.burst_readings = array("l", (0 for _ in range(self.MAX_READINGS_PER_BURST)))
 
-class ADS124S08_ADC(SPI_ADC):
+    def perform_initialization(self) -> None:
+        self.is_waiting_for_conversion = False
+
+        for channel in self.channels:
+            channel.initialize(self.spi, self.CS_pin_id, self.CS_ACTIVE)
+
+    def measure(self, query: q.MeasurementQuery) -> q.MeasurementResponse:
+        if not self.is_initialized:
+            raise Exception("ADC not initialized, call `ADC.initialize()`")
+
+        if query.num_of_readings < 1 or query.num_of_readings > self.MAX_READINGS_PER_BURST:
+            return self.response.set(None, q.ADC_REFUSE, None, 0, f"MCP3204_ADC can take 1-{self.MAX_READINGS_PER_BURST} readings in bulk, not {query.num_of_readings}")
 
+        channel = self.channels[query.adc_channel_id]
+        count = channel.measure_into(self.burst_readings, query.num_of_readings)
+
+        return self.response.set(query, q.ADC_DATA_READY, self.burst_readings, count)
+
+
+
+class ADS124S08_ADC(SPI_ADC):
+    SUPPORTS_CONTINUOUS_MODE: bool = True
+    SUPPORTS_PIPELINING: bool = True
 
     DEFAULT_CONFIGURATION = {
         "INPMUX":   0b00010010, #12 AIN1 AIN2 inputs
@@ -306,6 +358,12 @@ class ADS124S08_ADC(SPI_ADC):
         "IDACMUX": 0x8b, # AIN8 AIN11
     }
 
+    CHANNELS_INPUTS_CONFIGURATION = (
+        CH0_INPUTS_CONFIGURATION,
+        CH1_INPUTS_CONFIGURATION,
+        CH2_INPUTS_CONFIGURATION,
+    )
+
     PT100_CONFIGURATION = {
         "PGA":      0b00001100, #0b 16
         "IDACMAG": 0b00000101, #05 500uA
@@ -314,10 +372,52 @@ class ADS124S08_ADC(SPI_ADC):
         "PGA":      0b00001001, #0b 2
         "IDACMAG": 0b00000100 #250uA
     }
+    NTC_CONFIGURATION = {
+        "PGA":      0b00000000, #PGA bypassed, gain 1
+        "IDACMAG": 0b00000100 #250uA, 1V across RRef keeps the IDACs in compliance with a 4 kOhm thermistor
+    }
+
+    PROBES_CONFIGURATION = {
+        s.SensorPt100: PT100_CONFIGURATION,
+        s.SensorPt1000: PT1000_CONFIGURATION,
+        s.SensorNTC: NTC_CONFIGURATION,
+    }
+
+    # Registers are written in this order, starting at INPMUX address
+    REGISTER_NAMES = ("INPMUX", "PGA", "DATARATE", "REF", "IDACMAG", "IDACMUX", "VBIAS", "SYS")
+    FIRST_REGISTER_ADDRESS = 0x02
+
+    # DATARATE register MODE bit, 1 is single-shot, 0 is continuous conversion
+    DATARATE_SINGLE_SHOT_BIT = 0b00100000
+
+    # DATARATE register values, G_CHOP | CLK | MODE | FILTER | DR
+    # The FILTER bit only selects sinc3 or the low-latency filter, there is no sinc1 on this part,
+    # the low-latency filter is the one that settles within a single conversion, so it serves as the fast sinc1
+    ACQUISITION_PROFILES = {
+        "precision":  0b10110001, # chop, low-latency filter, 5SPS
+        "default":    0b10110010, # chop, low-latency filter, 10SPS
+        "balanced":   0b10110100, # chop, low-latency filter, 20SPS
+        "fast":       0b00111001, # low-latency filter, 400SPS
+        "fast_sinc3": 0b00101001, # sinc3 filter, 400SPS
+    }
+    DEFAULT_ACQUISITION_PROFILE = "default"
+
+    # Output data rate for each DR[3:0] value
+    DATA_RATES_SPS = (2.5, 5, 10, 16.6, 20, 50, 60, 100, 200, 400, 800, 1000, 2000, 4000, 4000, 4000)
+
+    DATARATE_CHOP_BIT = 0b10000000
+
+    # Time the excitation currents and input RC filters need after a mux switch before START.
+    # The digital filter needs no extra wait, in single-shot mode DRDY only falls once it has settled.
+    # Carried over from the 275 ms timeout tuned at 10SPS with chop, less the 200 ms that conversion takes
+    ANALOG_SETTLING_MS = 75
 
-    CONVERSION_TIMEOUT_MS = 275
     conversion_timeout_start_ms: int = 0
 
+    MAX_READINGS_PER_BURST = 64
+
+    CONTINUOUS_BUFFER_SIZE = 64
+
 
     def __init__(self, ID: int, channels: tuple[ch.ADS124S08_Channel, ...], start_pin_id: int, reset_pin_id: int, drdy_pin_id: int, *args, **kwargs) -> None:
         super().__init__(ID, channels, *args, **kwargs)
@@ -327,6 +427,67 @@ class ADS124S08_ADC(SPI_ADC):
         self.START = Pin(start_pin_id, Pin.OUT)
         self.RESET = Pin(reset_pin_id, Pin.OUT) 
         self.DRDY_pin = Pin(drdy_pin_id, Pin.IN)     
+
+        # Burst results are written here directly by the channel, no per-sample allocations.
+        # Two buffers are swapped after every burst, so a pipelined response stays intact
+        # while the next burst is being acquired
+        self._burst_buffers = (
+            array("l", (0 for _ in range(self.MAX_READINGS_PER_BURST))),
+            array("l", (0 for _ in range(self.MAX_READINGS_PER_BURST))),
+        )
+        self._burst_buffer_index: int = 0
+        self.burst_readings = self._burst_buffers[0]
+        self.burst_count: int = 0
+
+        self.next_query: q.MeasurementQuery | None = None
+        # False when the chip already held the configuration, so there is nothing to settle
+        self.settling_required: bool = True
+
+        self.is_continuous: bool = False
+        self.continuous_queries: tuple[q.MeasurementQuery, ...] = ()
+        self.continuous_index: int = 0
+        self.continuous_discard_counter: int = 0
+        self.continuous_overruns: int = 0
+        self.continuous_missed_irqs: int = 0
+
+        # Ring buffer written by the DRDY handler and drained by the controller,
+        # the handler only moves head and the controller only moves tail
+        self._ring_readings = array("l", (0 for _ in range(self.CONTINUOUS_BUFFER_SIZE)))
+        self._ring_channel_ids = array("B", (0 for _ in range(self.CONTINUOUS_BUFFER_SIZE)))
+        self._ring_head: int = 0
+        self._ring_tail: int = 0
+
+        # Hard IRQ handlers cannot allocate, so the bound method is created once here
+        self._service_drdy_ref = self._service_drdy
+
+        # DRDY edges wake the measurement task, in polled mode straight from the IRQ,
+        # in continuous mode once the reading is in the ring buffer
+        self.drdy_flag = asyncio.ThreadSafeFlag()
+        self.DRDY_pin.irq(handler=self._drdy_irq, trigger=Pin.IRQ_FALLING, hard=True)
+
+        # Register image of every (channel, profile, probe) combination, indexed [channel_id][continuous][profile][probe]
+        self._register_images: list[tuple[dict, dict]] = []
+        for channel_id in range(len(self.CHANNELS_INPUTS_CONFIGURATION)):
+            images = ({}, {})
+            for continuous in (False, True):
+                for profile in self.ACQUISITION_PROFILES:
+                    images[continuous][profile] = {}
+                    for probe in self.PROBES_CONFIGURATION:
+                        images[continuous][profile][probe] = self.compile_configuration(channel_id, probe, continuous, profile)
+            self._register_images.append(images)
+
+        self._discard_readings: dict[str, int] = {}
+        for profile, datarate in self.ACQUISITION_PROFILES.items():
+            self._discard_readings[profile] = self.calculate_discard_readings(datarate)
+
+        # Copy of what the chip currently holds, so that only changed registers are written
+        self._shadow_registers = bytearray(len(self.REGISTER_NAMES))
+        self._wreg_buffer = bytearray(2 + len(self.REGISTER_NAMES))
+        self._wreg_view = memoryview(self._wreg_buffer)
+        # Slicing a memoryview allocates, so a view of every possible WREG length is made here
+        self._wreg_views = tuple(self._wreg_view[:length] for length in range(len(self._wreg_buffer) + 1))
+        self._start_command = bytearray((0x08,))
+        self._stop_command = bytearray((0x0a,))
         
 
     def perform_initialization(self) -> None:
@@ -373,124 +534,360 @@ class ADS124S08_ADC(SPI_ADC):
             channel.initialize(self.spi, self.CS_pin_id, self.CS_ACTIVE)
 
     def perform_configuration(self, configuration: dict):
-        c = configuration
+        # Writes every register, the shadow copy is only trusted after this
+        self.write_registers(self.configuration_to_image(configuration), force=True)
 
+    def start_conversion(self) -> None:
         self.CS.value(self.CS_ACTIVE)
         utime.sleep_us(1)
 
-        #WREG START
-        msg = bytearray()
-        msg.append(0b01000010)
-        msg.append(0x07)
-
-        msg.append(c["INPMUX"])
-        msg.append(c["PGA"]) 
-        msg.append(c["DATARATE"]) 
-        msg.append(c["REF"]) 
-        msg.append(c["IDACMAG"])
-        msg.append(c["IDACMUX"])
-        msg.append(c["VBIAS"])
-        msg.append(c["SYS"])
-
-        self.spi.write(msg)
+        # START   
+        self.spi.write(self._start_command)
 
         self.CS.value(not self.CS_ACTIVE)
-        utime.sleep_us(50)
+        utime.sleep_us(5)
 
-    def start_conversion(self) -> None:
+    def stop_conversion(self) -> None:
         self.CS.value(self.CS_ACTIVE)
         utime.sleep_us(1)
 
-        # START   
-        msg = bytearray()
-        msg.append(0x08)
-        self.spi.write(msg)
+        # STOP   
+        self.spi.write(self._stop_command)
 
         self.CS.value(not self.CS_ACTIVE)
         utime.sleep_us(5)
 
-    def measure_channel(self, channel_id: int) -> list[int]:
-        channel = self.channels[channel_id]
+    def configure(self, query: q.MeasurementQuery, continuous: bool=False) -> bool:
+        return self.write_registers(self.get_register_image(query, continuous))
 
-        reading = channel.measure() 
-        return reading
-        
-    def configure(self, query: q.MeasurementQuery) -> None:
+    def get_register_image(self, query: q.MeasurementQuery, continuous: bool=False) -> bytearray:
+        channel_id = query.adc_channel_id
+
+        if channel_id < 0 or channel_id >= len(self._register_images):
+            raise Exception(f"Invalid channel id = `{channel_id}`")
+
+        profile = query.acquisition_profile
+        if profile not in self.ACQUISITION_PROFILES:
+            raise Exception(f"Invalid acquisition profile = `{profile}`")
+
+        images = self._register_images[channel_id][continuous][profile]
+        image = images.get(query.probe)
 
+        if image is None:
+            # Probe without a dedicated preset, compiled once on first use
+            image = self.compile_configuration(channel_id, query.probe, continuous, profile)
+            images[query.probe] = image
+
+        return image
+
+    def compile_configuration(self, channel_id: int, probe: type[s.SensorProbe]|None, continuous: bool, profile: str) -> bytearray:
         c = {}
         c.update(self.DEFAULT_CONFIGURATION)
+        c.update(self.CHANNELS_INPUTS_CONFIGURATION[channel_id])
 
-        channel_id = query.adc_channel_id
-        probe = query.probe
+        probe_configuration = self.PROBES_CONFIGURATION.get(probe)
+        if probe_configuration:
+            c.update(probe_configuration)
 
-        if channel_id == 0:
-            c.update(self.CH0_INPUTS_CONFIGURATION)
-        elif channel_id == 1:
-            c.update(self.CH1_INPUTS_CONFIGURATION)
-        elif channel_id == 2: 
-            c.update(self.CH2_INPUTS_CONFIGURATION)
+        c["DATARATE"] = self.ACQUISITION_PROFILES[profile]
+
+        if continuous:
+            c["DATARATE"] = c["DATARATE"] & ~self.DATARATE_SINGLE_SHOT_BIT
+
+        return self.configuration_to_image(c)
+
+    def configuration_to_image(self, configuration: dict) -> bytearray:
+        image = bytearray(len(self.REGISTER_NAMES))
+
+        for i, name in enumerate(self.REGISTER_NAMES):
+            image[i] = configuration[name]
+
+        return image
+
+    @classmethod
+    def calculate_conversion_period_ms(cls, datarate: int) -> float:
+        period_ms = 1000 / cls.DATA_RATES_SPS[datarate & 0x0f]
+
+        # Global chop averages two conversions with swapped inputs
+        if datarate & cls.DATARATE_CHOP_BIT:
+            period_ms *= 2
+
+        return period_ms
+
+    @classmethod
+    def calculate_discard_readings(cls, datarate: int) -> int:
+        # Writing INPMUX/IDACMUX restarts the conversion, but in continuous mode nothing waits
+        # for the analog front end, so conversions within ANALOG_SETTLING_MS are discarded instead
+        period_ms = cls.calculate_conversion_period_ms(datarate)
+        discard = int(cls.ANALOG_SETTLING_MS / period_ms)
+
+        if discard * period_ms < cls.ANALOG_SETTLING_MS:
+            discard += 1
+
+        return discard
+
+    def write_registers(self, image: bytearray, force: bool=False) -> bool:
+        length = self.prepare_register_write(image, force)
+
+        if length == 0:
+            # Chip already holds this configuration
+            return False
+
+        self.CS.value(self.CS_ACTIVE)
+        utime.sleep_us(1)
+
+        self.spi.write(self._wreg_views[length])
+
+        self.CS.value(not self.CS_ACTIVE)
+        utime.sleep_us(50)
+
+        return True
+
+    def prepare_register_write(self, image: bytearray, force: bool=False) -> int:
+        # Fills the WREG buffer and updates the shadow copy, returns the message length (0 if nothing changed)
+        shadow = self._shadow_registers
+        num_of_registers = len(shadow)
+
+        if force:
+            first = 0
+            last = num_of_registers - 1
         else:
-            raise Exception(f"Invalid channel id = `{channel_id}`")
+            first = 0
+            while first < num_of_registers and shadow[first] == image[first]:
+                first += 1
+
+            if first == num_of_registers:
+                return 0
+
+            last = num_of_registers - 1
+            while shadow[last] == image[last]:
+                last -= 1
+
+        # Smallest contiguous WREG covering every changed register
+        msg = self._wreg_buffer
+        msg[0] = 0x40 | (self.FIRST_REGISTER_ADDRESS + first)
+        msg[1] = last - first
+
+        for i in range(first, last + 1):
+            msg[2 + i - first] = image[i]
+            shadow[i] = image[i]
+
+        return 3 + last - first
+
+    def read_and_configure(self, channel: ch.ADS124S08_Channel, next_query: q.MeasurementQuery, stop: bool, continuous: bool) -> int:
+        # Result of the current conversion is read and the next channel is configured
+        # in a single CS window, writing the registers also restarts the conversion
+        image = self.get_register_image(next_query, continuous)
+
+        self.CS.value(self.CS_ACTIVE)
+        utime.sleep_us(1)
 
-        if probe == s.SensorPt100:
-            c.update(self.PT100_CONFIGURATION)
-        elif probe == s.SensorPt1000:
-            c.update(self.PT1000_CONFIGURATION)
+        rx = channel.transfer(select=False)
 
-        self.perform_configuration(configuration=c)
+        if stop:
+            self.spi.write(self._stop_command)
+
+        length = self.prepare_register_write(image)
+        if length > 0:
+            self.spi.write(self._wreg_views[length])
+
+        self.CS.value(not self.CS_ACTIVE)
+        utime.sleep_us(50)
+
+        self.settling_required = length > 0
+
+        return channel.decode(rx)
+
+    def queue_next(self, query: q.MeasurementQuery) -> bool:
+        if self.is_continuous or query.num_of_readings < 1 or query.num_of_readings > self.MAX_READINGS_PER_BURST:
+            return False
+
+        self.next_query = query
+        return True
+
+    def swap_burst_buffers(self) -> None:
+        self._burst_buffer_index ^= 1
+        self.burst_readings = self._burst_buffers[self._burst_buffer_index]
+        self.burst_count = 0
+
+    def start_continuous(self, queries: tuple[q.MeasurementQuery, ...]) -> None:
+        if not self.is_initialized:
+            raise Exception("ADC not initialized, call `ADC.initialize()`")
+
+        self.stop_continuous()
+
+        if len(queries) < 1:
+            return
+
+        # Drop a single-shot query which may still be in progress
+        self.query_in_progress = None
+        self.next_query = None
+        self.is_waiting_for_conversion = False
+
+        self.continuous_queries = tuple(queries)
+        self.continuous_index = 0
+        self.continuous_discard_counter = self._discard_readings[self.continuous_queries[0].acquisition_profile]
+        self._ring_head = 0
+        self._ring_tail = 0
+
+        self.configure(self.continuous_queries[0], continuous=True)
+
+        self.is_continuous = True
+
+        self.start_conversion()
+
+    def stop_continuous(self) -> None:
+        if not self.is_continuous:
+            return
+
+        self.is_continuous = False
+
+        self.stop_conversion()
+
+    def _drdy_irq(self, pin: Pin) -> None:
+        if not self.is_continuous:
+            self.drdy_flag.set()
+            return
+
+        try:
+            micropython.schedule(self._service_drdy_ref, 0)
+        except RuntimeError:
+            # Schedule queue is full, this conversion result will be overwritten
+            self.continuous_missed_irqs += 1
+
+    def _service_drdy(self, _) -> None:
+        if not self.is_continuous:
+            return
+
+        query = self.continuous_queries[self.continuous_index]
+        channel = self.channels[query.adc_channel_id]
+        num_of_queries = len(self.continuous_queries)
+
+        if self.continuous_discard_counter > 0 or num_of_queries == 1:
+            reading = channel.perform_measurement()
+
+            if self.continuous_discard_counter > 0:
+                self.continuous_discard_counter -= 1
+                return
+
+            self._push_reading(query.global_channel_id, reading)
+            return
+
+        self.continuous_index = (self.continuous_index + 1) % num_of_queries
+        next_query = self.continuous_queries[self.continuous_index]
+
+        reading = self.read_and_configure(channel, next_query, stop=False, continuous=True)
+        self.continuous_discard_counter = self._discard_readings[next_query.acquisition_profile]
+
+        self._push_reading(query.global_channel_id, reading)
+
+    def _push_reading(self, global_channel_id: int, reading: int) -> None:
+        head = self._ring_head
+        next_head = (head + 1) % self.CONTINUOUS_BUFFER_SIZE
+
+        if next_head == self._ring_tail:
+            # Buffer is full, newest reading is dropped so that tail stays owned by the reader
+            self.continuous_overruns += 1
+            return
+
+        self._ring_readings[head] = reading
+        self._ring_channel_ids[head] = global_channel_id
+        self._ring_head = next_head
+
+        self.drdy_flag.set()
+
+    def continuous_available(self) -> bool:
+        return self._ring_head != self._ring_tail
+
+    def pop_continuous(self) -> tuple[int, int]:
+        tail = self._ring_tail
+        if tail == self._ring_head:
+            raise Exception("Continuous buffer is empty, check `ADC.continuous_available()` first")
+
+        global_channel_id = self._ring_channel_ids[tail]
+        reading = self._ring_readings[tail]
+        self._ring_tail = (tail + 1) % self.CONTINUOUS_BUFFER_SIZE
+
+        return global_channel_id, reading
 
 
 
     def measure(self, query: q.MeasurementQuery) -> q.MeasurementResponse:
 
-        if query.num_of_readings > 1:
-            return q.MeasurementResponse(
-                query_in_progress=None,
-                status=q.ADC_REFUSE,
-                message="ADS124S08_ADC currently does not support taking multiple readings in bulk",
-            )
+        if self.is_continuous:
+            return self.response.set(None, q.ADC_REFUSE, None, 0, "ADS124S08_ADC is running in continuous mode, call `ADC.stop_continuous()` first")
+
+        if query.num_of_readings < 1 or query.num_of_readings > self.MAX_READINGS_PER_BURST:
+            return self.response.set(None, q.ADC_REFUSE, None, 0, f"ADS124S08_ADC can take 1-{self.MAX_READINGS_PER_BURST} readings in bulk, not {query.num_of_readings}")
 
 
         if (not self.query_in_progress):
             self.query_in_progress = query
+            self.burst_count = 0
 
-            self.configure(query)
+            # Bursts run in continuous conversion mode, so the configuration and settling
+            # time are paid once per burst instead of once per reading
+            self.settling_required = self.configure(query, continuous=query.num_of_readings > 1)
             self.conversion_timeout_start_ms = utime.ticks_ms()
 
-            return q.MeasurementResponse(
-                query_in_progress=self.query_in_progress,
-                status=q.ADC_ACCEPT,
-            )
+            return self.response.set(self.query_in_progress, q.ADC_ACCEPT)
 
         assert self.query_in_progress is not None
 
-        if (utime.ticks_diff(utime.ticks_ms(), self.conversion_timeout_start_ms) > self.CONVERSION_TIMEOUT_MS):
+        if (not self.settling_required or utime.ticks_diff(utime.ticks_ms(), self.conversion_timeout_start_ms) > self.ANALOG_SETTLING_MS):
             if not self.is_waiting_for_conversion:
                 self.start_conversion()
                 self.is_waiting_for_conversion = True
-                # if self.query_in_progress.adc_channel_id == 0:
-                #     print(self.CONVERSION_TIMEOUT_MS, end=",")
-                #     self.CONVERSION_TIMEOUT_MS += 1
-                return q.MeasurementResponse(
-                query_in_progress=self.query_in_progress,
-                status=q.ADC_CONVERSION_TIMEOUT,
-                )
+                return self.response.set(self.query_in_progress, q.ADC_CONVERSION_TIMEOUT)
             
-        if (self.DRDY_pin.value() == 0):
-            readings = self.measure_channel(self.query_in_progress.adc_channel_id)
+        if (self.is_waiting_for_conversion and self.DRDY_pin.value() == 0):
+            query = self.query_in_progress
+            channel = self.channels[query.adc_channel_id]
+            next_query = self.next_query
+            is_burst = query.num_of_readings > 1
+
+            if self.burst_count + 1 < query.num_of_readings:
+                self.burst_count += channel.measure_into(self.burst_readings, 1, self.burst_count)
 
-            response = q.MeasurementResponse(
-                query_in_progress=self.query_in_progress,
-                status=q.ADC_DATA_READY,
-                readings=readings,
-            )
+                return self.response.set(query, q.ADC_WAITING_FOR_CONVERSION)
+
+            if next_query is not None:
+                self.burst_readings[self.burst_count] = self.read_and_configure(channel, next_query, stop=is_burst, continuous=next_query.num_of_readings > 1)
+                self.burst_count += 1
+            else:
+                self.burst_count += channel.measure_into(self.burst_readings, 1, self.burst_count)
+
+                if is_burst:
+                    self.stop_conversion()
+
+            response = self.response.set(query, q.ADC_DATA_READY, self.burst_readings, self.burst_count)
             self.is_waiting_for_conversion = False
             self.query_in_progress = None
+            self.swap_burst_buffers()
+
+            if next_query is not None:
+                # Next channel is already configured, its settling time starts now
+                self.next_query = None
+                self.query_in_progress = next_query
+                self.conversion_timeout_start_ms = utime.ticks_ms()
 
             return response
         
 
-        return q.MeasurementResponse(
-            query_in_progress=self.query_in_progress,
-            status=q.ADC_WAITING_FOR_CONVERSION,
-        )
+        return self.response.set(self.query_in_progress, q.ADC_WAITING_FOR_CONVERSION)
+
+    def get_wait_ms(self) -> int | None:
+        if self.is_continuous:
+            return None
+
+        if self.query_in_progress is None:
+            return 0
+
+        if self.is_waiting_for_conversion:
+            return 0 if self.DRDY_pin.value() == 0 else None
+
+        if self.settling_required:
+            # `measure()` starts the conversion once strictly more than the settling time has passed
+            return max(self.ANALOG_SETTLING_MS + 1 - utime.ticks_diff(utime.ticks_ms(), self.conversion_timeout_start_ms), 0)
+
+        return 0
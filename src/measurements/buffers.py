@@ -0,0 +1,102 @@
+from array import array
+
+
+class ReadingsRingBuffer():
+    """
+    Fixed capacity circular buffer of raw ADC readings with a running sum,
+    appending a reading and getting the mean are O(1) regardless of capacity
+    """
+
+    def __init__(self, capacity: int, typecode: str="l") -> None:
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, not {capacity}")
+
+        self.typecode = typecode
+        self.capacity = capacity
+        self.buffer = array(typecode, (0 for _ in range(capacity)))
+
+        # Index where the next reading will be written
+        self.head: int = 0
+        self.count: int = 0
+        self.sum: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, reading: int) -> None:
+        head = self.head
+
+        if self.count == self.capacity:
+            # Oldest reading is overwritten
+            self.sum -= self.buffer[head]
+        else:
+            self.count += 1
+
+        self.buffer[head] = reading
+        self.sum += reading
+
+        head += 1
+        if head == self.capacity:
+            head = 0
+        self.head = head
+
+    def mean(self) -> float:
+        if self.count == 0:
+            raise ValueError("Buffer is empty")
+
+        return self.sum / self.count
+
+    def mean_int(self) -> int:
+        if self.count == 0:
+            raise ValueError("Buffer is empty")
+
+        return self.sum // self.count
+
+    def newest(self) -> int:
+        if self.count == 0:
+            raise ValueError("Buffer is empty")
+
+        return self.buffer[self.head - 1]
+
+    def values(self):
+        # Oldest to newest
+        start = self.head - self.count
+        for i in range(start, self.head):
+            yield self.buffer[i % self.capacity]
+
+    def copy_into(self, out: array, offset: int=0) -> int:
+        # Copies readings oldest to newest, returns the number of copied readings
+        start = self.head - self.count
+        for i in range(self.count):
+            out[offset + i] = self.buffer[(start + i) % self.capacity]
+
+        return self.count
+
+    def clear(self) -> None:
+        self.head = 0
+        self.count = 0
+        self.sum = 0
+
+    def resize(self, capacity: int) -> None:
+        # Newest readings which fit in the new capacity are kept
+        if capacity == self.capacity:
+            return
+
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, not {capacity}")
+
+        buffer = array(self.typecode, (0 for _ in range(capacity)))
+        count = min(self.count, capacity)
+
+        start = self.head - count
+        total = 0
+        for i in range(count):
+            reading = self.buffer[(start + i) % self.capacity]
+            buffer[i] = reading
+            total += reading
+
+        self.buffer = buffer
+        self.capacity = capacity
+        self.count = count
+        self.sum = total
+        self.head = count % capacity
@@ -0,0 +1,204 @@
+from collections import namedtuple
+
+from . import filters
+
+from device_config import __DeviceConfig
+
+
+# Flat, read-only copy of a channel config which the measurement loop reads instead of the config itself.
+# A new plan is compiled on every change, so a different plan object means the config has changed
+AcquisitionPlan = namedtuple("AcquisitionPlan", (
+    "name",
+    "verbose_name",
+    "is_enabled",
+    "probe",
+    "num_readings_per_measurement",
+    "time_between_measurements_ms",
+    "num_of_readings_to_store",
+    "calibration",
+    "acquisition_profile",
+    "filters",
+    "extra_attrs",
+))
+
+MAX_READINGS_PER_MEASUREMENT = 64
+MAX_READINGS_TO_STORE = 2048
+# Due times are computed with `utime.ticks_add`, which only accepts intervals below 2**29 ms (about 6.2 days)
+MAX_TIME_BETWEEN_MEASUREMENTS_MS = 24 * 60 * 60 * 1000
+
+
+def validate_int(value, min_value: int, max_value: int|None, field: str) -> int:
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"`{field}` must be an integer, not `{value}`")
+
+    if value < min_value or (max_value is not None and value > max_value):
+        raise ValueError(f"`{field}` must be in range {min_value}-{max_value}, not {value}")
+
+    return value
+
+
+def validate_name(value) -> str:
+    if not isinstance(value, str) or len(value) < 1:
+        raise ValueError(f"Channel name must be a non-empty string, not `{value}`")
+
+    return value
+
+
+def validate_verbose_name(value) -> str:
+    if not isinstance(value, str):
+        raise ValueError(f"Verbose name must be a string, not `{value}`")
+
+    return value
+
+
+def validate_is_enabled(value) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError(f"`is_enabled` must be True or False, not `{value}`")
+
+    return value
+
+
+def validate_probe(value):
+    if value not in __DeviceConfig.ALLOWED_PROBES_TYPES:
+        raise ValueError(f"Invalid probe type `{value}`")
+
+    return value
+
+
+def validate_num_readings_per_measurement(value) -> int:
+    return validate_int(value, 1, MAX_READINGS_PER_MEASUREMENT, "_num_readings_per_measurement")
+
+
+def validate_time_between_measurements_ms(value) -> int:
+    return validate_int(value, 0, MAX_TIME_BETWEEN_MEASUREMENTS_MS, "time_between_measurements_ms")
+
+
+def validate_num_of_readings_to_store(value) -> int:
+    return validate_int(value, 1, MAX_READINGS_TO_STORE, "num_of_readings_to_store")
+
+
+def validate_calibration(value) -> tuple:
+    # JSON gives a list, it is stored as a tuple so nothing can change it without going through the setter
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise ValueError(f"Calibration must be a pair (R_ref offset, resistance offset), not `{value}`")
+
+    for number in value:
+        if not isinstance(number, (int, float)) or isinstance(number, bool):
+            raise ValueError(f"Calibration values must be numbers, not `{number}`")
+
+    return tuple(value)
+
+
+def validate_acquisition_profile(value) -> str:
+    if value not in __DeviceConfig.ALLOWED_ACQUISITION_PROFILES:
+        raise ValueError(f"Invalid acquisition profile `{value}`, not in `{__DeviceConfig.ALLOWED_ACQUISITION_PROFILES}`")
+
+    return value
+
+
+def validate_filters(value) -> list:
+    if not isinstance(value, list):
+        raise ValueError(f"Filters must be a list of filter specs, not `{value}`")
+
+    # Raises ValueError on unknown types or bad parameters
+    filters.build_filter_chain(value)
+
+    return value
+
+
+def validate_extra_attrs(value) -> dict:
+    if not isinstance(value, dict):
+        raise ValueError(f"`_extra_attrs` must be a dict, not `{value}`")
+
+    return value
+
+
+def config_field(attr: str, validate) -> property:
+    def getter(self):
+        return getattr(self, attr)
+
+    def setter(self, value) -> None:
+        setattr(self, attr, validate(value))
+
+        # Fields are set one by one in `__init__`, the plan is compiled once they are all there
+        if self.plan is not None:
+            self.compile()
+
+    return property(getter, setter)
+
+
+class ChannelConfig():
+    """
+    Validated configuration of a single channel, stored in the same layout as the JSON config file
+    """
+
+    __slots__ = (
+        "_name",
+        "_verbose_name",
+        "_is_enabled",
+        "_probe",
+        "_num_readings_per_measurement",
+        "_time_between_measurements_ms",
+        "_num_of_readings_to_store",
+        "_calibration",
+        "_acquisition_profile",
+        "_filters",
+        "_extra_attrs",
+        "plan",
+    )
+
+    # JSON key -> attribute
+    FIELDS = (
+        ("_name", "name"),
+        ("verbose_name", "verbose_name"),
+        ("is_enabled", "is_enabled"),
+        ("probe", "probe"),
+        ("_num_readings_per_measurement", "num_readings_per_measurement"),
+        ("time_between_measurements_ms", "time_between_measurements_ms"),
+        ("num_of_readings_to_store", "num_of_readings_to_store"),
+        ("_calibration", "calibration"),
+        ("acquisition_profile", "acquisition_profile"),
+        ("filters", "filters"),
+        ("_extra_attrs", "extra_attrs"),
+    )
+
+    name = config_field("_name", validate_name)
+    verbose_name = config_field("_verbose_name", validate_verbose_name)
+    is_enabled = config_field("_is_enabled", validate_is_enabled)
+    probe = config_field("_probe", validate_probe)
+    num_readings_per_measurement = config_field("_num_readings_per_measurement", validate_num_readings_per_measurement)
+    time_between_measurements_ms = config_field("_time_between_measurements_ms", validate_time_between_measurements_ms)
+    num_of_readings_to_store = config_field("_num_of_readings_to_store", validate_num_of_readings_to_store)
+    calibration = config_field("_calibration", validate_calibration)
+    acquisition_profile = config_field("_acquisition_profile", validate_acquisition_profile)
+    filters = config_field("_filters", validate_filters)
+    extra_attrs = config_field("_extra_attrs", validate_extra_attrs)
+
+    def __init__(self, data: dict) -> None:
+        self.plan: AcquisitionPlan | None = None
+
+        for key, attr in self.FIELDS:
+            if key not in data:
+                raise ValueError(f"Channel config is missing `{key}`")
+
+            setattr(self, attr, data[key])
+
+        self.compile()
+
+    def compile(self) -> None:
+        self.plan = AcquisitionPlan(
+            self._name,
+            self._verbose_name,
+            self._is_enabled,
+            self._probe,
+            self._num_readings_per_measurement,
+            self._time_between_measurements_ms,
+            self._num_of_readings_to_store,
+            self._calibration,
+            self._acquisition_profile,
+            self._filters,
+            self._extra_attrs,
+        )
+
+    def asdict(self) -> dict:
+        return dict((key, getattr(self, attr)) for key, attr in self.FIELDS)
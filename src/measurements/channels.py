@@ -1,4 +1,5 @@
 from machine import Pin, SPI, ADC
+from array import array
 import utime
 
 
@@ -20,6 +21,13 @@ class BaseChannel():
 
         return readings
 
+    def measure_into(self, buffer: array, num_of_times: int=1, offset: int=0) -> int:
+        # Allocation free alternative to `measure()`, readings are written into a caller supplied array
+        for i in range(offset, offset + num_of_times):
+            buffer[i] = self.perform_measurement()
+
+        return num_of_times
+
     def perform_measurement(self) -> int:
         raise NotImplementedError
 
@@ -44,11 +52,20 @@ class OnBoardADC_Channel(BaseChannel):
 
 
 class SPI_ADC_BaseChannel(BaseChannel):
+    # Length of a single read transaction (command + data), in bytes
+    TRANSACTION_LENGTH: int = 1
+
     def __init__(self, ID_global: int, ID_adc_channel: int, *args, **kwargs) -> None:
         super().__init__(ID_global, ID_adc_channel, *args, **kwargs)
 
         self.is_initialized: bool = False
 
+        # Fixed buffers for `spi.write_readinto`, so that reading a sample doesn't allocate
+        self._tx_buffer = bytearray(self.TRANSACTION_LENGTH)
+        self._rx_buffer = bytearray(self.TRANSACTION_LENGTH)
+        self._tx_view = memoryview(self._tx_buffer)
+        self._rx_view = memoryview(self._rx_buffer)
+
     def initialize(self, spi_object: SPI, CS_pin_id: int, CS_active_state: bool=False):
         self.perform_initialization(spi_object, CS_pin_id, CS_active_state)
         self.is_initialized = True
@@ -70,71 +87,71 @@ class SPI_ADC_BaseChannel(BaseChannel):
         
         return super().measure(num_of_times, *args, **kwargs)
 
+    def measure_into(self, buffer: array, num_of_times: int=1, offset: int=0) -> int:
+        if not self.is_initialized:
+            raise Exception("Channel not initialized, call `channel.initialize()`")
+        
+        return super().measure_into(buffer, num_of_times, offset)
+
+    def transfer(self, select: bool=True) -> bytearray:
+        # `select=False` lets the ADC keep CS asserted and put more commands in the same window
+        if select:
+            self.CS.value(self.CS_ACTIVE)
+            utime.sleep_us(1)
+
+        self.spi.write_readinto(self._tx_view, self._rx_view)
+
+        if select:
+            self.CS.value(not self.CS_ACTIVE)
+            utime.sleep_us(5)
+
+        return self._rx_buffer
+
+    def decode(self, rx: bytearray) -> int:
+        raise NotImplementedError
+
+    def perform_measurement(self) -> int:
+        return self.decode(self.transfer())
+
 class ADS1148_Channel(SPI_ADC_BaseChannel):
+    TRANSACTION_LENGTH: int = 3
      
     def __init__(self, ID_global: int, ID_adc_channel: int, *args, **kwargs) -> None:
         super().__init__(ID_global, ID_adc_channel, *args, **kwargs)
 
-    def perform_measurement(self) -> int:
-        self.CS.value(self.CS_ACTIVE)
-        utime.sleep_us(1)
-        
-        #RDATA
-        msg = bytearray()
-        msg.append(0x12)
-        self.spi.write(msg)
-
-        reading = self.spi.read(2)
-        reading = int.from_bytes(reading, "big")
-        
-        self.CS.value(not self.CS_ACTIVE)
-        utime.sleep_us(5)
+        #RDATA, remaining bytes are NOPs clocking the result out
+        self._tx_buffer[0] = 0x12
 
-        return reading
+    def decode(self, rx: bytearray) -> int:
+        return (rx[1] << 8) | rx[2]
 
 
 class ADS124S08_Channel(SPI_ADC_BaseChannel):
+    TRANSACTION_LENGTH: int = 4
      
     def __init__(self, ID_global: int, ID_adc_channel: int, *args, **kwargs) -> None:
         super().__init__(ID_global, ID_adc_channel, *args, **kwargs)
 
-    def perform_measurement(self) -> int:
-        self.CS.value(self.CS_ACTIVE)
-        utime.sleep_us(1)
-        
-        #RDATA
-        msg = bytearray()
-        msg.append(0x12)
-        self.spi.write(msg)
-
-        reading = self.spi.read(3)
-        reading = int.from_bytes(reading, "big")
-        
-        self.CS.value(not self.CS_ACTIVE)
-        utime.sleep_us(5)
+        #RDATA, remaining bytes are NOPs clocking the result out
+        self._tx_buffer[0] = 0x12
 
-        return reading
+    def decode(self, rx: bytearray) -> int:
+        return (rx[1] << 16) | (rx[2] << 8) | rx[3]
 
 class MCP3204BaseChannel(SPI_ADC_BaseChannel):
+    TRANSACTION_LENGTH: int = 3
+
+    # Second command byte, selects single ended input
+    CHANNEL_CODES = (0x00, 0x40, 0x80, 0xC0)
      
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
 
-    def perform_measurement(self) -> int:
-        
-        self.CS.value(self.CS_ACTIVE)
-        utime.sleep_us(5) 
-
-        msg = bytearray()
-        msg.append(0x06)
-        self.spi.write(msg)
-
-        channel_code = {"CH1": 0x00, "CH2": 0x40, "CH3": 0x80, "CH4": 0xC0}
-        reading = self.spi.read(2, channel_code["CH1"])
-        reading = int.from_bytes(reading, "big")
-
-        self.CS.value(not self.CS_ACTIVE)
-        utime.sleep_us(5)
+        # Start bit and single ended mode
+        self._tx_buffer[0] = 0x06
+        self._tx_buffer[1] = self.CHANNEL_CODES[self.ID_adc_channel]
 
-        return reading
+    def decode(self, rx: bytearray) -> int:
+        # Upper bits of the second byte are undefined, the result is 12 bits long
+        return ((rx[1] << 8) | rx[2]) & 0x0FFF
         
@@ -1,39 +1,69 @@
 import utime
+import uasyncio as asyncio
 
 from . import ADCs
 from . import queries
 from . import sensors
+from . import buffers
+from . import filters
+from . import conversions
+from . import results
+from . import history
+from . import logger
+from . import scheduler
+from . import channel_config
 
 
 from device_config import __DeviceConfig
 
 
 class MeasurementProcessor():
-    def __init__(self, config: list[dict]) -> None:
+    def __init__(self, config: list[channel_config.ChannelConfig], fixed_point: bool=False) -> None:
+        # Settings are read from each channel's compiled `plan`, so changes apply on the next reading
         self.config = config
 
-        self.storage: list[dict]
-        self.storage = [{"readings":[], "processed": {}} for i in range(len(self.config))]
-
-    def calculate_channel(self, readings: list[int], global_channel_id: int) -> dict:
-        ch_config = self.config[global_channel_id]
+        # In fixed-point mode values flow as integer milli-units and results are updated in place
+        self.fixed_point = fixed_point
 
-        reading_avg = sum(readings)/len(readings)
+        self.storage: list[dict]
+        self.storage = [
+            {
+                "readings": buffers.ReadingsRingBuffer(channel.plan.num_of_readings_to_store), 
+                "processed": {}
+            } for channel in self.config
+        ]
+
+        # Filter chains are rebuilt whenever a channel gets a new "filters" list
+        self.filter_chains: list[filters.FilterChain] = [filters.FilterChain(()) for _ in self.config]
+        self._filter_specs: list[list[dict] | None] = [None for _ in self.config]
+
+        # Raw code -> temperature tables, rebuilt whenever a channel gets a new probe or calibration
+        self.lookup_tables: list[conversions.TemperatureLookupTable | None] = [None for _ in self.config]
+        self._lookup_table_keys: list[tuple | None] = [None for _ in self.config]
+        self.fixed_point_tables: list[conversions.FixedPointLookupTable | None] = [None for _ in self.config]
+        self._fixed_point_table_keys: list[tuple | None] = [None for _ in self.config]
+
+    def calculate_channel(self, reading_avg: float, global_channel_id: int) -> dict:
+        plan = self.config[global_channel_id].plan
         
         R = __DeviceConfig.calculate_resistance_ADS124S08(
             reading_avg, 
-            ch_config["probe"],
-            ch_config["_calibration"],
+            plan.probe,
+            plan.calibration,
         )
         
-        T_c = ch_config["probe"].calculate_temperature_celsius(R)
-        T_k = ch_config["probe"].celsius_to_kelvin(T_c)
-        T_f = ch_config["probe"].celsius_to_fahrenheit(T_c)
+        table = self.get_lookup_table(global_channel_id)
+        if table is not None:
+            T_c = table.temperature(reading_avg)
+        else:
+            T_c = plan.probe.calculate_temperature_celsius(R)
+        T_k = plan.probe.celsius_to_kelvin(T_c)
+        T_f = plan.probe.celsius_to_fahrenheit(T_c)
 
         return {
-            "_name": ch_config["_name"],
-            "verbose_name": ch_config["verbose_name"],
-            "probe": ch_config["probe"],
+            "_name": plan.name,
+            "verbose_name": plan.verbose_name,
+            "probe": plan.probe,
             "avg_reading": reading_avg, "resistance_Om": R, 
             "temperature_C": T_c, "temperature_K": T_k, "temperature_F": T_f
         }
@@ -43,108 +73,511 @@ class MeasurementProcessor():
         mr = measurement_response
         assert mr.query_in_progress is not None and mr.readings is not None
 
-        global_channel_id = mr.query_in_progress.global_channel_id
+        self.process_readings(mr.readings, mr.num_of_readings, mr.query_in_progress.global_channel_id)
+
+    def process_readings(self, readings, num_of_readings: int, global_channel_id: int) -> None:
+        self.store_measurements(readings, num_of_readings, global_channel_id)
+
+        chain = self.get_filter_chain(global_channel_id)
+        filtered = None
+        if len(chain) > 0:
+            for i in range(num_of_readings):
+                filtered = chain.update(readings[i])
+
+        self.update_processed(global_channel_id, filtered)
+
+    def process_reading(self, reading: int, global_channel_id: int) -> None:
+        self.get_readings(global_channel_id).append(reading)
+
+        chain = self.get_filter_chain(global_channel_id)
+        filtered = None
+        if len(chain) > 0:
+            filtered = chain.update(reading)
+
+        self.update_processed(global_channel_id, filtered)
+
+    def update_channel_result(self, reading_avg: int, global_channel_id: int) -> results.ChannelResult:
+        plan = self.config[global_channel_id].plan
+
+        result = self.storage[global_channel_id]["processed"]
+        if not isinstance(result, results.ChannelResult):
+            result = results.ChannelResult()
+
+        result._name = plan.name
+        result.verbose_name = plan.verbose_name
+        result.probe = plan.probe
+        result.avg_reading = reading_avg
+
+        table = self.get_fixed_point_table(global_channel_id)
+        if table is not None:
+            segment = table.find_segment(reading_avg)
+            result.resistance_mOm = table.resistance_mOm(reading_avg, segment)
+            result.temperature_mC = table.temperature_mC(reading_avg, segment)
+        else:
+            # Probes without a lookup table go through the float formulas
+            R = __DeviceConfig.calculate_resistance_ADS124S08(reading_avg, plan.probe, plan.calibration)
+            result.resistance_mOm = round(R * 1000)
+            result.temperature_mC = round(plan.probe.calculate_temperature_celsius(R) * 1000)
 
-        self.store_measurements(mr.readings, global_channel_id)
+        return result
 
-        all_readings = self.get_readings(global_channel_id)
+    def update_processed(self, global_channel_id: int, filtered: float | None=None) -> None:
+        if self.fixed_point:
+            if filtered is None:
+                reading_avg = self.get_readings(global_channel_id).mean_int()
+            else:
+                reading_avg = int(filtered)
 
-        processed_values = self.calculate_channel(all_readings, global_channel_id)
+            self.storage[global_channel_id]["processed"] = self.update_channel_result(reading_avg, global_channel_id)
+            return
+
+        # Without a filter chain the channel value is a plain mean of stored readings
+        if filtered is None:
+            reading_avg = self.get_readings(global_channel_id).mean()
+        else:
+            reading_avg = filtered
+
+        processed_values = self.calculate_channel(reading_avg, global_channel_id)
 
         self.storage[global_channel_id]["processed"] = processed_values
 
-       
 
+    def store_measurements(self, readings, num_of_readings: int, global_channel_id: int) -> None:
+        buffer = self.get_readings(global_channel_id)
 
-    def store_measurements(self, readings: list[int], global_channel_id: int) -> None:
-        gch_id = global_channel_id
+        for i in range(num_of_readings):
+            buffer.append(readings[i])
 
-        for reading in readings:
-            self.storage[gch_id]["readings"].append(reading)
+    def get_filter_chain(self, global_channel_id: int) -> filters.FilterChain:
+        specs = self.config[global_channel_id].plan.filters
 
-        num_of_readings_to_store = self.config[gch_id]["num_of_readings_to_store"]
-        
-        # keep a list of readings up to date, remove oldest sample when new one is present
-        if len(self.storage[gch_id]["readings"]) > num_of_readings_to_store:
-            self.storage[gch_id]["readings"].pop(0)
+        if specs is not self._filter_specs[global_channel_id]:
+            self.filter_chains[global_channel_id] = filters.build_filter_chain(specs)
+            self._filter_specs[global_channel_id] = specs
+
+        return self.filter_chains[global_channel_id]
+
+    def convert_readings(self, codes, global_channel_id: int, resistances, temperatures) -> None:
+        # Batch counterpart of `calculate_channel`, e.g. to reprocess stored readings after a calibration change.
+        # Device only, under CPython `__DeviceConfig` in the class bodies of this module is name-mangled
+        # and the import fails, host tools call `conversions.convert_batch()` directly
+        plan = self.config[global_channel_id].plan
+
+        conversions.convert_batch(
+            codes,
+            plan.probe,
+            plan.calibration,
+            resistances,
+            temperatures,
+            self.get_lookup_table(global_channel_id),
+        )
+
+    def get_lookup_table(self, global_channel_id: int) -> conversions.TemperatureLookupTable | None:
+        plan = self.config[global_channel_id].plan
+        key = self._lookup_table_keys[global_channel_id]
+
+        if key is None or key[0] is not plan.probe or key[1] is not plan.calibration:
+            self.lookup_tables[global_channel_id] = conversions.build_lookup_table(plan.probe, plan.calibration)
+            self._lookup_table_keys[global_channel_id] = (plan.probe, plan.calibration)
+
+        return self.lookup_tables[global_channel_id]
+
+    def get_fixed_point_table(self, global_channel_id: int) -> conversions.FixedPointLookupTable | None:
+        plan = self.config[global_channel_id].plan
+        key = self._fixed_point_table_keys[global_channel_id]
+
+        if key is None or key[0] is not plan.probe or key[1] is not plan.calibration:
+            self.fixed_point_tables[global_channel_id] = conversions.build_fixed_point_lookup_table(plan.probe, plan.calibration)
+            self._fixed_point_table_keys[global_channel_id] = (plan.probe, plan.calibration)
 
-    def get_readings(self, global_channel_id: int) -> list[int]:
-        return self.storage[global_channel_id]["readings"]
+        return self.fixed_point_tables[global_channel_id]
+
+    def get_readings(self, global_channel_id: int) -> buffers.ReadingsRingBuffer:
+        buffer = self.storage[global_channel_id]["readings"]
+
+        # Window length may be changed at runtime, oldest readings are dropped when it shrinks
+        num_of_readings_to_store = self.config[global_channel_id].plan.num_of_readings_to_store
+        if buffer.capacity != num_of_readings_to_store:
+            buffer.resize(num_of_readings_to_store)
+
+        return buffer
 
 
 class MeasurementController():
+    # Lower bound on the retry of a refused query, refusals that don't clear on their own
+    # (e.g. a burst size the ADC can't take) would otherwise be retried on every pass
+    REFUSED_QUERY_BACKOFF_MS = 100
 
-    def __init__(self, config: list[dict], ADC_objects: tuple[ADCs.SimpleADC], processor: MeasurementProcessor, *args, **kwargs) -> None:
+    def __init__(self, config: list[channel_config.ChannelConfig], ADC_objects: tuple[ADCs.SimpleADC], processor: MeasurementProcessor, continuous_mode: bool=False, routing: tuple[tuple[int, int], ...]=__DeviceConfig.CHANNEL_ROUTING, history: history.MeasurementHistory | None=None, logger: logger.MeasurementLogger | None=None, logging_enabled: bool=False, *args, **kwargs) -> None:
         
         for adc_object in ADC_objects:
             if not isinstance(adc_object, ADCs.SimpleADC):
                 raise TypeError("`ADCs` must be of `SimpleADC` type")
+
+        if len(routing) < len(config):
+            raise Exception(f"Routing has {len(routing)} entries, but there are {len(config)} channels")
+
+        for adc_id, adc_channel_id in routing:
+            if adc_id < 0 or adc_id >= len(ADC_objects):
+                raise Exception(f"Routing points to ADC `{adc_id}`, but only {len(ADC_objects)} ADCs are available")
             
-        self.config = config
         self.ADCs = ADC_objects
         self.processor = processor
+        self.config = config
+        self.history = history
+        self.logger = logger
+        self.logging_enabled = logging_enabled
+
+        # global channel id -> (adc_id, adc_channel_id), adc_id is an index into `self.ADCs`
+        self.routing = routing
+        self.adc_channels: tuple[tuple[int, ...], ...] = tuple(
+            tuple(global_channel_id for global_channel_id in range(len(config)) if routing[global_channel_id][0] == adc_id)
+            for adc_id in range(len(self.ADCs))
+        )
 
         self.last_measurement_times_ms = [0]*len(self.config)
 
-        self.current_results: list = []
-
-        self.channel_counter = 0
+        # Entries are replaced per channel, the list itself is never rebuilt
+        self.current_results: list = [data["processed"] for data in self.processor.storage]
+
+        # Incremented on every new result, snapshots for readers are built on demand
+        self.results_version: int = 0
+        self._results_snapshot = results.ResultsSnapshot(0, tuple({} for _ in self.current_results))
+
+        # Each ADC has at most one query in flight and its own scheduler,
+        # so channels on different ADCs convert at the same time
+        self.in_flight_queries: list[queries.MeasurementQuery | None] = [None]*len(self.ADCs)
+        self.channel_queries: list[queries.MeasurementQuery] = [
+            queries.MeasurementQuery(
+                global_channel_id=global_channel_id,
+                adc_id=routing[global_channel_id][0],
+                adc_channel_id=routing[global_channel_id][1],
+                probe=channel.plan.probe,
+                num_of_readings=channel.plan.num_readings_per_measurement,
+                acquisition_profile=channel.plan.acquisition_profile,
+                extra_attrs=channel.plan.extra_attrs,
+            ) for global_channel_id, channel in enumerate(self.config)
+        ]
+        self.schedulers = [scheduler.ChannelScheduler(len(self.config)) for _ in self.ADCs]
+        self._schedule_signatures: list[tuple | None] = [None]*len(self.ADCs)
         self.last_measured_channel_id = None
+
+        # In continuous mode the ADC scans enabled channels by itself (DRDY interrupt driven),
+        # the controller only drains readings the ADC has buffered
+        self.continuous_mode = continuous_mode
+        self._continuous_scan_signatures: list[tuple | None] = [None]*len(self.ADCs)
+
+    @property
+    def config(self) -> list[channel_config.ChannelConfig]:
+        return self._config
+
+    @config.setter
+    def config(self, config: list[channel_config.ChannelConfig]) -> None:
+        self._config = config
+        self.processor.config = config
+        self._plans = [channel.plan for channel in config]
+        self._is_continuous_scan_outdated = True
+
+    def refresh_config(self) -> None:
+        # Plans are recompiled on every config change, an unchanged plan object means an unchanged channel
+        for global_channel_id, channel in enumerate(self._config):
+            if channel.plan is not self._plans[global_channel_id]:
+                self._plans[global_channel_id] = channel.plan
+                self._is_continuous_scan_outdated = True
+
+    @property
+    def continuous_mode(self) -> bool:
+        return self._continuous_mode
+
+    @continuous_mode.setter
+    def continuous_mode(self, continuous_mode: bool) -> None:
+        self._continuous_mode = continuous_mode
+        self._is_continuous_scan_outdated = True
         
     def query_measurement(self, query: queries.MeasurementQuery) -> queries.MeasurementResponse:
         adc = self.ADCs[query.adc_id]
 
         return adc.measure(query)
 
+    def build_query(self, global_channel_id: int, num_of_readings: int) -> queries.MeasurementQuery:
+        # Query objects are reused, a channel has at most one polled query in flight at a time
+        plan = self.config[global_channel_id].plan
+
+        return self.channel_queries[global_channel_id].update(
+            plan.probe,
+            num_of_readings,
+            plan.acquisition_profile,
+            plan.extra_attrs,
+        )
+
+    def build_continuous_query(self, global_channel_id: int) -> queries.MeasurementQuery:
+        # Continuous scans keep their queries, so they don't share the polled ones
+        plan = self.config[global_channel_id].plan
+        adc_id, adc_channel_id = self.routing[global_channel_id]
+
+        return queries.MeasurementQuery(
+            global_channel_id=global_channel_id,
+            adc_id=adc_id,
+            adc_channel_id=adc_channel_id,
+            probe=plan.probe,
+            num_of_readings=1,
+            acquisition_profile=plan.acquisition_profile,
+            extra_attrs=plan.extra_attrs,
+        )
+
         
     def run(self):
+
+        if self._is_continuous_scan_outdated:
+            self.update_continuous_scans()
+            self.update_schedules()
+
+        for adc_id in range(len(self.ADCs)):
+            if self._continuous_scan_signatures[adc_id] is not None:
+                self.drain_continuous(adc_id)
+            else:
+                self.handle_adc(adc_id)
+
+    def get_wait_ms(self, max_wait_ms: int) -> tuple[int, int | None]:
+        # Time until `run()` has work to do and the id of an ADC whose DRDY event may end the wait sooner
+        wait_ms = max_wait_ms
+        event_adc_id = None
+
+        if self._is_continuous_scan_outdated:
+            return 0, None
+
+        for adc_id, adc in enumerate(self.ADCs):
+            if self._continuous_scan_signatures[adc_id] is None and self.in_flight_queries[adc_id] is None:
+                adc_wait_ms = self.schedulers[adc_id].get_wait_ms()
+                if adc_wait_ms is None:
+                    continue
+            else:
+                adc_wait_ms = adc.get_wait_ms()
+
+            if adc_wait_ms is None:
+                if adc.drdy_flag is None or event_adc_id is not None:
+                    # Events of more than one ADC can't be awaited at once, fall back to polling
+                    adc_wait_ms = 1
+                else:
+                    event_adc_id = adc_id
+                    continue
+
+            if adc_wait_ms < wait_ms:
+                wait_ms = adc_wait_ms
+
+        return wait_ms, event_adc_id
+
+    async def wait_for_work(self, max_wait_ms: int) -> None:
+        wait_ms, event_adc_id = self.get_wait_ms(max_wait_ms)
+
+        if event_adc_id is None or wait_ms == 0:
+            await asyncio.sleep_ms(wait_ms)
+            return
+
+        try:
+            await asyncio.wait_for_ms(self.ADCs[event_adc_id].drdy_flag.wait(), wait_ms) # type: ignore
+        except asyncio.TimeoutError:
+            pass
+
+    def handle_adc(self, adc_id: int) -> None:
+        query = self.in_flight_queries[adc_id]
+
+        if query is None:
+            query = self.get_next_query(adc_id)
+
+            if query is None:
+                return
         
-        self.handle_channel(self.channel_counter)
+        response = self.query_measurement(query)
+        self.handle_response(adc_id, query, response)
 
-        self.channel_counter += 1
-        self.channel_counter = self.channel_counter % __DeviceConfig.NUM_OF_CHANNELS
+        if response.status == queries.ADC_DATA_READY and self.in_flight_queries[adc_id] is None:
+            # ADC is idle, start the next query right away instead of waiting for another pass
+            query = self.get_next_query(adc_id)
 
+            if query is not None:
+                self.handle_response(adc_id, query, self.query_measurement(query))
 
-    def handle_channel(self, global_channel_id):
+    def handle_response(self, adc_id: int, query: queries.MeasurementQuery, response: queries.MeasurementResponse) -> None:
+        adc = self.ADCs[adc_id]
 
-        channel = self.config[global_channel_id]
+        if response.status == queries.ADC_DATA_READY:
+            # A pipelining ADC has already configured the queued query at this point,
+            # so processing the result overlaps with the next channel settling
+            self.in_flight_queries[adc_id] = adc.query_in_progress
+            self.process_response(response)
 
-        if (not channel["is_enabled"]):
-            return
+        elif response.status == queries.ADC_REFUSE:
+            self.in_flight_queries[adc_id] = None
+            # Channel was taken off the schedule when the query was built
+            self.schedulers[adc_id].complete(query.global_channel_id, self.get_refusal_backoff_ms(adc_id))
+
+        else:
+            self.in_flight_queries[adc_id] = response.query_in_progress
+
+            if adc.SUPPORTS_PIPELINING and adc.next_query is None and response.query_in_progress is not None: # type: ignore
+                self.queue_next_query(adc_id, response.query_in_progress.global_channel_id)
+
+    def process_response(self, response: queries.MeasurementResponse) -> None:
+        response_channel_id = response.query_in_progress.global_channel_id # type: ignore
+
+        self.processor.process_measurement(response)
+        self.current_results[response_channel_id] = self.processor.storage[response_channel_id]["processed"]
+        self.results_version += 1
+        self.record_measurement(response_channel_id)
+
+        self.last_measurement_times_ms[response_channel_id] = utime.ticks_ms()
+        self.last_measured_channel_id = response_channel_id
 
-        if global_channel_id == self.last_measured_channel_id and __DeviceConfig.NUM_OF_CHANNELS:
+        adc_id = self.routing[response_channel_id][0]
+        self.schedulers[adc_id].complete(response_channel_id, self.config[response_channel_id].plan.time_between_measurements_ms)
+
+    def record_measurement(self, global_channel_id: int) -> None:
+        if self.history is None and not (self.logging_enabled and self.logger is not None):
             return
 
-        if (utime.ticks_diff(utime.ticks_ms(), self.last_measurement_times_ms[global_channel_id]) < channel["time_between_measurements_ms"]):
-            # Skip channel if not enough time has passed
+        processed = self.processor.storage[global_channel_id]["processed"]
+        timestamp = utime.time()
+        temperature_C = processed["temperature_C"]
+
+        if self.history is not None:
+            self.history.add(global_channel_id, timestamp, temperature_C)
+
+        if self.logging_enabled and self.logger is not None:
+            self.logger.log(timestamp, global_channel_id, int(processed["avg_reading"]), temperature_C)
+
+    def get_next_query(self, adc_id: int) -> queries.MeasurementQuery | None:
+        global_channel_id = self.schedulers[adc_id].pop_due()
+
+        if global_channel_id is None:
+            return None
+
+        return self.build_query(global_channel_id, self.config[global_channel_id].plan.num_readings_per_measurement)
+
+    def queue_next_query(self, adc_id: int, in_flight_channel_id: int) -> None:
+        # Channel in flight is off the schedule until its measurement completes
+        global_channel_id = self.schedulers[adc_id].pop_due()
+
+        if global_channel_id is None and self.config[in_flight_channel_id].plan.time_between_measurements_ms <= 0:
+            # Nothing else is due, measure the same channel back to back
+            global_channel_id = in_flight_channel_id
+
+        if global_channel_id is None:
             return
 
-        # TODO implement dynamic adc selection
-        adc_id = 0
-        adc_channel_id = global_channel_id
+        query = self.build_query(global_channel_id, self.config[global_channel_id].plan.num_readings_per_measurement)
 
-        query = queries.MeasurementQuery(
-            global_channel_id=global_channel_id,
-            adc_id=adc_id,
-            adc_channel_id=adc_channel_id,
-            probe=channel["probe"],
-            num_of_readings=channel["_num_readings_per_measurement"],
-            **channel["_extra_attrs"],
-        )
-        
-        response = self.query_measurement(query)
-        
+        if not self.ADCs[adc_id].queue_next(query): # type: ignore
+            self.schedulers[adc_id].complete(global_channel_id, self.get_refusal_backoff_ms(adc_id))
 
-        if response.status == queries.ADC_DATA_READY:
-            response_channel_id = response.query_in_progress.global_channel_id # type: ignore
+    def get_refusal_backoff_ms(self, adc_id: int) -> int:
+        # A refused channel is retried once the ADC's own work is done, which for an ADC
+        # waiting on DRDY (None) is unknown, so the fixed backoff is used instead
+        adc_wait_ms = self.ADCs[adc_id].get_wait_ms()
+
+        if adc_wait_ms is None or adc_wait_ms < self.REFUSED_QUERY_BACKOFF_MS:
+            return self.REFUSED_QUERY_BACKOFF_MS
+
+        return adc_wait_ms
 
-            self.processor.process_measurement(response)
-            self.current_results = [data["processed"] for data in self.processor.storage]
-            # if self.current_results[response_channel_id]["_name"] == "CH0":
-            #     print(self.current_results[response_channel_id]["resistance_Om"])
-            self.last_measurement_times_ms[response_channel_id] = utime.ticks_ms()
-            self.last_measured_channel_id = response_channel_id
+    def update_schedules(self) -> None:
+        for adc_id in range(len(self.ADCs)):
+            if self._continuous_scan_signatures[adc_id] is not None:
+                # ADC scans by itself, the schedule is rebuilt once it goes back to polling
+                self._schedule_signatures[adc_id] = None
+                continue
+
+            channels = [global_channel_id for global_channel_id in self.adc_channels[adc_id] if self.config[global_channel_id].plan.is_enabled]
+
+            signature = tuple((global_channel_id, self.config[global_channel_id].plan.time_between_measurements_ms) for global_channel_id in channels)
+            if signature == self._schedule_signatures[adc_id]:
+                continue
+
+            self._schedule_signatures[adc_id] = signature
+
+            in_flight = []
+            if self.in_flight_queries[adc_id] is not None:
+                in_flight.append(self.in_flight_queries[adc_id].global_channel_id) # type: ignore
+            if self.ADCs[adc_id].SUPPORTS_PIPELINING and self.ADCs[adc_id].next_query is not None: # type: ignore
+                in_flight.append(self.ADCs[adc_id].next_query.global_channel_id) # type: ignore
+
+            self.schedulers[adc_id].set_channels(
+                [(global_channel_id, utime.ticks_add(self.last_measurement_times_ms[global_channel_id], interval_ms)) for global_channel_id, interval_ms in signature],
+                in_flight=tuple(in_flight),
+            )
+
+    def get_schedule_stats(self) -> list[dict]:
+        return [self.schedulers[self.routing[global_channel_id][0]].get_stats(global_channel_id) for global_channel_id in range(len(self.config))]
+
+    def drain_continuous(self, adc_id: int) -> None:
+        adc = self.ADCs[adc_id]
+
+        while adc.continuous_available(): # type: ignore
+            global_channel_id, reading = adc.pop_continuous() # type: ignore
+
+            plan = self.config[global_channel_id].plan
+
+            if (utime.ticks_diff(utime.ticks_ms(), self.last_measurement_times_ms[global_channel_id]) < plan.time_between_measurements_ms):
+                # Discard reading if not enough time has passed
+                continue
+
+            self.processor.process_reading(reading, global_channel_id)
+            self.current_results[global_channel_id] = self.processor.storage[global_channel_id]["processed"]
+            self.results_version += 1
+            self.record_measurement(global_channel_id)
+
+            self.last_measurement_times_ms[global_channel_id] = utime.ticks_ms()
+            self.last_measured_channel_id = global_channel_id
+
+    def update_continuous_scans(self) -> None:
+        self._is_continuous_scan_outdated = False
+
+        for adc_id, adc in enumerate(self.ADCs):
+            if not adc.SUPPORTS_CONTINUOUS_MODE:
+                continue
+
+            if not self.continuous_mode:
+                if self._continuous_scan_signatures[adc_id] is not None:
+                    adc.stop_continuous() # type: ignore
+                    self._continuous_scan_signatures[adc_id] = None
+                continue
+
+            channels = [global_channel_id for global_channel_id in self.adc_channels[adc_id] if self.config[global_channel_id].plan.is_enabled]
+
+            signature = tuple((global_channel_id, self.config[global_channel_id].plan.probe, self.config[global_channel_id].plan.acquisition_profile) for global_channel_id in channels)
+            if signature == self._continuous_scan_signatures[adc_id] and adc.is_continuous: # type: ignore
+                continue
+
+            self._continuous_scan_signatures[adc_id] = signature
+            # A polled query in progress is dropped by the ADC when the scan starts
+            self.in_flight_queries[adc_id] = None
+
+            scan = tuple(self.build_continuous_query(global_channel_id) for global_channel_id in channels)
+            adc.start_continuous(scan) # type: ignore
 
     def get_current_results(self) -> list:
         return self.current_results
 
+    def get_results_snapshot(self) -> results.ResultsSnapshot:
+        if self._results_snapshot.version != self.results_version:
+            self._results_snapshot = results.ResultsSnapshot(
+                self.results_version,
+                tuple(self.serialize_result(result) for result in self.current_results),
+            )
+
+        return self._results_snapshot
+
+    @staticmethod
+    def serialize_result(result) -> dict:
+        if len(result) == 0:
+            return {}
+
+        if isinstance(result, results.ChannelResult):
+            data = result.asdict()
+        else:
+            data = result.copy()
+
+        data["probe"] = __DeviceConfig.SENSORS_AS_TEXT[data["probe"]]
+
+        return data
+
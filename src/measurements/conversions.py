@@ -0,0 +1,310 @@
+from array import array
+
+from . import sensors
+from device_config import __DeviceConfig
+
+# Available when the module is used on the host for offline analysis of device dumps
+try:
+    import numpy # type: ignore
+except ImportError:
+    numpy = None
+
+
+class TemperatureLookupTable():
+    """
+    Piecewise linear map from raw ADC code to temperature in Celsius, built once per (probe, calibration).
+    A conversion is one binary search and one linear interpolation, codes outside the table are extrapolated from the edge segment.
+    With the Pt100/Pt1000 5 °C step the maximum error against the Callendar-Van Dusen equation
+    is 0.0026 °C (segment starting at -200 °C), 0.0015 °C above -100 °C and 0.0013 °C above 0 °C
+    """
+
+    def __init__(self, codes: array, temperatures: array) -> None:
+        if len(codes) != len(temperatures) or len(codes) < 2:
+            raise ValueError("Lookup table needs at least 2 breakpoints of codes and temperatures")
+
+        # Codes must be ascending
+        self.codes = codes
+        self.temperatures = temperatures
+        self.last_segment = len(codes) - 2
+
+    def find_segment(self, code: float) -> int:
+        codes = self.codes
+        low = 0
+        high = self.last_segment
+
+        # Largest i such that codes[i] <= code, clamped to a valid segment
+        while low < high:
+            middle = (low + high + 1) >> 1
+            if codes[middle] <= code:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+    def temperature(self, code: float) -> float:
+        i = self.find_segment(code)
+
+        c0 = self.codes[i]
+        t0 = self.temperatures[i]
+
+        return t0 + (code - c0) * (self.temperatures[i + 1] - t0) / (self.codes[i + 1] - c0)
+
+    def temperatures_into(self, codes, temperatures) -> None:
+        table_codes = self.codes
+        table_temperatures = self.temperatures
+        last_segment = self.last_segment
+
+        # Consecutive readings are close to each other, the previous segment is checked before searching
+        i = 0
+        c0 = table_codes[0]
+        c1 = table_codes[1]
+
+        for n in range(len(codes)):
+            code = codes[n]
+
+            if not (c0 <= code < c1):
+                i = self.find_segment(code)
+                c0 = table_codes[i]
+                c1 = table_codes[i + 1]
+
+                if i == 0:
+                    # Edge segments are extrapolated
+                    c0 = -1e30
+                if i == last_segment:
+                    c1 = 1e30
+
+            t0 = table_temperatures[i]
+            temperatures[n] = t0 + (code - table_codes[i]) * (table_temperatures[i + 1] - t0) / (table_codes[i + 1] - table_codes[i])
+
+
+def build_lookup_table(probe: type[sensors.SensorProbe], calibration: tuple) -> TemperatureLookupTable | None:
+    if probe.TABLE_RANGE_CELSIUS is None:
+        return None
+
+    T_min, T_max, step = probe.TABLE_RANGE_CELSIUS
+    num_of_breakpoints = int((T_max - T_min) / step) + 1
+
+    codes = array("f", (0 for _ in range(num_of_breakpoints)))
+    temperatures = array("f", (0 for _ in range(num_of_breakpoints)))
+
+    for i in range(num_of_breakpoints):
+        T_c = T_min + i * step
+        R = probe.calculate_resistance_ohm(T_c)
+
+        codes[i] = __DeviceConfig.calculate_reading_ADS124S08(R, probe, calibration)
+        temperatures[i] = T_c
+
+    if codes[0] > codes[-1]:
+        # Probes with a negative temperature coefficient
+        for i in range(num_of_breakpoints // 2):
+            j = num_of_breakpoints - 1 - i
+            codes[i], codes[j] = codes[j], codes[i]
+            temperatures[i], temperatures[j] = temperatures[j], temperatures[i]
+
+    return TemperatureLookupTable(codes, temperatures)
+
+
+class FixedPointLookupTable():
+    """
+    Integer counterpart of `TemperatureLookupTable`, maps raw ADC code to milli-degrees Celsius and milli-ohms.
+    Segments are narrow enough for every intermediate product to stay a small int, so no conversion touches the heap.
+    The table covers every code the ADC can return, edge segments run to the code limits instead of being extrapolated
+    """
+
+    # MicroPython small ints are 31-bit, larger values are allocated on the heap
+    SMALL_INT_LIMIT = 1 << 30
+
+    # Codes returned by `ADS124S08_Channel.read()`
+    MIN_CODE = 0
+    MAX_CODE = (1 << 24) - 1
+
+    # Resistance slope is stored as milli-ohms per code scaled by 2**resistance_slope_shift,
+    # tables with wide segments use a smaller shift
+    RESISTANCE_SLOPE_SHIFT = 14
+
+    def __init__(self, codes: array, temperatures_mC: array, resistances_mOm: array, resistance_slope: int, resistance_slope_shift: int=RESISTANCE_SLOPE_SHIFT) -> None:
+        if not (len(codes) == len(temperatures_mC) == len(resistances_mOm)) or len(codes) < 2:
+            raise ValueError("Lookup table needs at least 2 breakpoints of codes, temperatures and resistances")
+
+        # Codes must be ascending
+        self.codes = codes
+        self.temperatures_mC = temperatures_mC
+        self.resistances_mOm = resistances_mOm
+        self.resistance_slope = resistance_slope
+        self.resistance_slope_shift = resistance_slope_shift
+        self.last_segment = len(codes) - 2
+
+        self.check_ranges()
+
+    def check_ranges(self) -> None:
+        # Every value and product used by a conversion must be a small int for all codes the ADC can return
+        limit = self.SMALL_INT_LIMIT
+        codes = self.codes
+
+        if codes[0] > self.MIN_CODE or codes[-1] < self.MAX_CODE:
+            raise ValueError(f"Lookup table covers codes {codes[0]}-{codes[-1]}, not {self.MIN_CODE}-{self.MAX_CODE}")
+
+        for i in range(len(codes)):
+            if abs(self.temperatures_mC[i]) >= limit or abs(self.resistances_mOm[i]) >= limit:
+                raise ValueError(f"Breakpoint {i} of the lookup table is out of the small int range")
+
+        for i in range(self.last_segment + 1):
+            width = codes[i + 1] - codes[i]
+            if width <= 0:
+                raise ValueError(f"Lookup table codes must be ascending, segment {i} is {width} codes wide")
+
+            if width * abs(self.temperatures_mC[i + 1] - self.temperatures_mC[i]) >= limit:
+                raise ValueError(f"Temperature product of lookup table segment {i} is out of the small int range")
+            if width * abs(self.resistance_slope) >= limit:
+                raise ValueError(f"Resistance product of lookup table segment {i} is out of the small int range")
+
+    def find_segment(self, code: int) -> int:
+        codes = self.codes
+        low = 0
+        high = self.last_segment
+
+        while low < high:
+            middle = (low + high + 1) >> 1
+            if codes[middle] <= code:
+                low = middle
+            else:
+                high = middle - 1
+
+        return low
+
+    def temperature_mC(self, code: int, segment: int | None=None) -> int:
+        i = self.find_segment(code) if segment is None else segment
+
+        c0 = self.codes[i]
+        t0 = self.temperatures_mC[i]
+
+        return t0 + (code - c0) * (self.temperatures_mC[i + 1] - t0) // (self.codes[i + 1] - c0)
+
+    def resistance_mOm(self, code: int, segment: int | None=None) -> int:
+        i = self.find_segment(code) if segment is None else segment
+
+        # Resistance is linear in code, the slope is shared by all segments
+        return self.resistances_mOm[i] + (((code - self.codes[i]) * self.resistance_slope) >> self.resistance_slope_shift)
+
+
+def build_fixed_point_breakpoints(probe: type[sensors.SensorProbe], calibration: tuple, table: TemperatureLookupTable) -> tuple[list, list]:
+    # Float breakpoints of `table` limited to the ADC code range, with segments split until
+    # the temperature product of `FixedPointLookupTable.temperature_mC()` is a small int
+    limit = FixedPointLookupTable.SMALL_INT_LIMIT // 2
+    min_code = FixedPointLookupTable.MIN_CODE
+    max_code = FixedPointLookupTable.MAX_CODE
+
+    codes = [float(min_code)]
+    temperatures = [table.temperature(min_code)]
+
+    def add_segment(c1: float, t1: float, exact: bool) -> None:
+        c0 = codes[-1]
+        t0 = temperatures[-1]
+
+        num_of_parts = 1
+        while (c1 - c0) / num_of_parts * abs(t1 - t0) * 1000 / num_of_parts >= limit:
+            num_of_parts += 1
+
+        for j in range(1, num_of_parts):
+            if exact:
+                # Inside the table the probe equation is used, so splitting also makes the table more accurate
+                T_c = t0 + (t1 - t0) * j / num_of_parts
+                codes.append(__DeviceConfig.calculate_reading_ADS124S08(probe.calculate_resistance_ohm(T_c), probe, calibration))
+                temperatures.append(T_c)
+            else:
+                # Outside the table the edge segment is extrapolated, same as `TemperatureLookupTable`
+                code = c0 + (c1 - c0) * j / num_of_parts
+                codes.append(code)
+                temperatures.append(table.temperature(code))
+
+        codes.append(c1)
+        temperatures.append(t1)
+
+    for i in range(len(table.codes)):
+        code = table.codes[i]
+        if min_code < code < max_code:
+            add_segment(code, table.temperatures[i], exact=codes[-1] >= table.codes[0])
+
+    add_segment(float(max_code), table.temperature(max_code), exact=table.codes[-1] > max_code)
+
+    return codes, temperatures
+
+
+def build_fixed_point_lookup_table(probe: type[sensors.SensorProbe], calibration: tuple) -> FixedPointLookupTable | None:
+    table = build_lookup_table(probe, calibration)
+
+    if table is None:
+        return None
+
+    codes_float, temperatures_float = build_fixed_point_breakpoints(probe, calibration, table)
+    num_of_breakpoints = len(codes_float)
+
+    codes = array("l", (0 for _ in range(num_of_breakpoints)))
+    temperatures_mC = array("l", (0 for _ in range(num_of_breakpoints)))
+    resistances_mOm = array("l", (0 for _ in range(num_of_breakpoints)))
+
+    for i in range(num_of_breakpoints):
+        codes[i] = round(codes_float[i])
+        temperatures_mC[i] = round(temperatures_float[i] * 1000)
+        resistances_mOm[i] = round(__DeviceConfig.calculate_resistance_ADS124S08(codes[i], probe, calibration) * 1000)
+
+    R_per_code = __DeviceConfig.calculate_resistance_ADS124S08(1, probe, calibration) - __DeviceConfig.calculate_resistance_ADS124S08(0, probe, calibration)
+
+    # Largest shift which keeps the resistance product of the widest segment a small int
+    max_width = max(codes[i + 1] - codes[i] for i in range(num_of_breakpoints - 1))
+    shift = FixedPointLookupTable.RESISTANCE_SLOPE_SHIFT
+    while shift > 0 and max_width * abs(R_per_code) * 1000 * (1 << shift) >= FixedPointLookupTable.SMALL_INT_LIMIT:
+        shift -= 1
+
+    resistance_slope = round(R_per_code * 1000 * (1 << shift))
+
+    return FixedPointLookupTable(codes, temperatures_mC, resistances_mOm, resistance_slope, shift)
+
+
+def convert_batch(codes, probe: type[sensors.SensorProbe], calibration: tuple, resistances, temperatures, table: TemperatureLookupTable | None=None) -> None:
+    # Fills preallocated `resistances` and `temperatures` with values of raw `codes`,
+    # works with `array` on the device and with NumPy arrays on the host.
+    # This is the host entry point, `controllers` can only be imported on the device
+    num_of_codes = len(codes)
+    if len(resistances) < num_of_codes or len(temperatures) < num_of_codes:
+        raise ValueError(f"Output arrays must hold at least {num_of_codes} values")
+
+    if table is None:
+        table = build_lookup_table(probe, calibration)
+
+    # Resistance is linear in code
+    R_offset = __DeviceConfig.calculate_resistance_ADS124S08(0, probe, calibration)
+    R_per_code = __DeviceConfig.calculate_resistance_ADS124S08(1, probe, calibration) - R_offset
+
+    if numpy is not None and isinstance(codes, numpy.ndarray):
+        convert_batch_numpy(codes, probe, R_per_code, R_offset, resistances, temperatures, table)
+        return
+
+    for n in range(num_of_codes):
+        resistances[n] = codes[n] * R_per_code + R_offset
+
+    if table is not None:
+        table.temperatures_into(codes, temperatures)
+    else:
+        for n in range(num_of_codes):
+            temperatures[n] = probe.calculate_temperature_celsius(resistances[n])
+
+
+def convert_batch_numpy(codes, probe: type[sensors.SensorProbe], R_per_code: float, R_offset: float, resistances, temperatures, table: TemperatureLookupTable | None) -> None:
+    num_of_codes = len(codes)
+
+    resistances[:num_of_codes] = codes * R_per_code + R_offset
+
+    if table is None:
+        temperatures[:num_of_codes] = [probe.calculate_temperature_celsius(R) for R in resistances[:num_of_codes]]
+        return
+
+    # Same segments as `TemperatureLookupTable.find_segment`, edge segments are extrapolated
+    table_codes = numpy.asarray(table.codes, dtype=numpy.float64)
+    table_temperatures = numpy.asarray(table.temperatures, dtype=numpy.float64)
+    i = numpy.clip(numpy.searchsorted(table_codes, codes, side="right") - 1, 0, table.last_segment)
+
+    c0 = table_codes[i]
+    t0 = table_temperatures[i]
+    temperatures[:num_of_codes] = t0 + (codes - c0) * (table_temperatures[i + 1] - t0) / (table_codes[i + 1] - c0)
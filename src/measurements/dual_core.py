@@ -0,0 +1,203 @@
+import _thread
+from array import array
+import utime
+
+from . import controllers
+from . import logger
+from . import results
+
+
+class AcquisitionCore():
+    """
+    Runs a `MeasurementController` alone on core 1, everything else stays on core 0.
+    Results are published through a double buffer swapped under `lock`, settings and log records cross the same lock,
+    so core 1 never touches the filesystem or anything core 0 owns.
+    Continuous mode is not available here, its DRDY service is scheduled with `micropython.schedule`, which may run on either core
+    """
+
+    # Longest sleep between two passes when no conversion is pending
+    MAX_WAIT_MS = 50
+    # Poll interval while a conversion is pending, there is no event loop on core 1 to await DRDY
+    EVENT_POLL_MS = 1
+
+    LOG_QUEUE_SIZE = 64
+
+    def __init__(self, controller: controllers.MeasurementController) -> None:
+        self.controller = controller
+        self.lock = _thread.allocate_lock()
+
+        num_of_channels = len(controller.current_results)
+
+        # Written by core 1 only, `front` tells which one core 0 may read
+        self._buffers = ([{}]*num_of_channels, [{}]*num_of_channels)
+        self._fixed_point_buffers = (
+            tuple(results.ChannelResult() for _ in range(num_of_channels)),
+            tuple(results.ChannelResult() for _ in range(num_of_channels)),
+        )
+        self._front: int = 0
+        self._published_version: int = 0
+
+        # Core 0 copies of the front buffer
+        self.current_results: list = [{}]*num_of_channels
+        self._fixed_point_results = tuple(results.ChannelResult() for _ in range(num_of_channels))
+        self._results_version: int = 0
+        self._results_snapshot = results.EMPTY_SNAPSHOT
+
+        # Settings handed from core 0, applied by core 1 between passes
+        self._settings: tuple[bool, bool] = (False, False)
+        self._settings_pending: bool = False
+
+        # Log records queued by core 1 and written to flash by core 0, the two queues are swapped on every drain
+        self._log_queues = (self.create_log_queue(), self.create_log_queue())
+        self._log_queue_index: int = 0
+        self._log_fill: int = 0
+        self.log_overruns: int = 0
+
+        self.is_running: bool = False
+        self.num_of_passes: int = 0
+
+        # Set by core 1 when the controller raises, core 0 re-raises it in `check()`
+        self.failure: Exception | None = None
+
+    def create_log_queue(self) -> tuple:
+        # timestamps, global channel ids, raw codes, temperatures
+        return (
+            array("L", (0 for _ in range(self.LOG_QUEUE_SIZE))),
+            array("B", (0 for _ in range(self.LOG_QUEUE_SIZE))),
+            array("l", (0 for _ in range(self.LOG_QUEUE_SIZE))),
+            array("f", (0 for _ in range(self.LOG_QUEUE_SIZE))),
+        )
+
+    def start(self) -> None:
+        # Core 1 gets the controller for itself, it stops a running continuous scan on its first pass
+        # and logging goes through the queue
+        self.controller.continuous_mode = False
+        self.controller.logger = self # type: ignore
+
+        self.is_running = True
+        _thread.start_new_thread(self.run, ())
+
+    def stop(self) -> None:
+        self.is_running = False
+
+    def run(self) -> None:
+        # An exception would end the thread silently while core 0 keeps feeding the WDT
+        try:
+            self.run_passes()
+        except Exception as e:
+            self.failure = e
+            self.is_running = False
+
+    def run_passes(self) -> None:
+        controller = self.controller
+
+        while self.is_running:
+            if self._settings_pending:
+                with self.lock:
+                    fixed_point, logging_enabled = self._settings
+                    self._settings_pending = False
+
+                controller.refresh_config()
+                controller.processor.fixed_point = fixed_point
+                controller.logging_enabled = logging_enabled
+
+            controller.run()
+            self.num_of_passes += 1
+
+            if controller.results_version != self._published_version:
+                self.publish(controller.current_results, controller.results_version)
+
+            wait_ms, event_adc_id = controller.get_wait_ms(self.MAX_WAIT_MS)
+            if event_adc_id is not None and wait_ms > self.EVENT_POLL_MS:
+                wait_ms = self.EVENT_POLL_MS
+
+            if wait_ms > 0:
+                utime.sleep_ms(wait_ms)
+
+    def check(self) -> None:
+        if self.failure is not None:
+            raise Exception(f"Acquisition on core 1 failed, exception: {repr(self.failure)}")
+
+    def publish(self, current_results: list, version: int) -> None:
+        # Back buffer is filled without the lock, core 0 only reads the front one
+        back = self._front ^ 1
+        buffer = self._buffers[back]
+
+        for global_channel_id, result in enumerate(current_results):
+            if isinstance(result, results.ChannelResult):
+                # Fixed-point results are updated in place, so they are copied
+                buffer[global_channel_id] = self._fixed_point_buffers[back][global_channel_id].copy_from(result)
+            else:
+                # Float results are new dicts which are never changed afterwards
+                buffer[global_channel_id] = result
+
+        with self.lock:
+            self._front = back
+            self._published_version = version
+
+    def configure(self, fixed_point: bool, logging_enabled: bool) -> None:
+        with self.lock:
+            self._settings = (fixed_point, logging_enabled)
+            self._settings_pending = True
+
+    def log(self, timestamp: int, global_channel_id: int, raw_code: int, temperature_C: float) -> None:
+        # Called by the controller on core 1 in place of `MeasurementLogger.log`
+        with self.lock:
+            i = self._log_fill
+            if i >= self.LOG_QUEUE_SIZE:
+                self.log_overruns += 1
+                return
+
+            timestamps, channel_ids, codes, temperatures = self._log_queues[self._log_queue_index]
+            timestamps[i] = timestamp
+            channel_ids[i] = global_channel_id
+            codes[i] = raw_code
+            temperatures[i] = temperature_C
+            self._log_fill = i + 1
+
+    def drain_log(self, measurement_logger: logger.MeasurementLogger | None) -> None:
+        # Queues are swapped under the lock, so a flash write in `MeasurementLogger.log` never blocks core 1
+        with self.lock:
+            timestamps, channel_ids, codes, temperatures = self._log_queues[self._log_queue_index]
+            num_of_records = self._log_fill
+
+            self._log_queue_index ^= 1
+            self._log_fill = 0
+
+        if measurement_logger is None:
+            return
+
+        for i in range(num_of_records):
+            measurement_logger.log(timestamps[i], channel_ids[i], codes[i], temperatures[i])
+
+    def get_current_results(self) -> list:
+        if self._results_version == self._published_version:
+            return self.current_results
+
+        with self.lock:
+            front = self._buffers[self._front]
+
+            for global_channel_id, result in enumerate(front):
+                if isinstance(result, results.ChannelResult):
+                    self.current_results[global_channel_id] = self._fixed_point_results[global_channel_id].copy_from(result)
+                else:
+                    self.current_results[global_channel_id] = result
+
+            self._results_version = self._published_version
+
+        return self.current_results
+
+    def get_results_snapshot(self) -> results.ResultsSnapshot:
+        current_results = self.get_current_results()
+
+        if self._results_snapshot.version != self._results_version:
+            self._results_snapshot = results.ResultsSnapshot(
+                self._results_version,
+                tuple(controllers.MeasurementController.serialize_result(result) for result in current_results),
+            )
+
+        return self._results_snapshot
+
+    def get_schedule_stats(self) -> list[dict]:
+        # Plain counters, a read racing with an update is off by one measurement at most
+        return self.controller.get_schedule_stats()
@@ -0,0 +1,294 @@
+from array import array
+from math import tan, pi, sqrt, isfinite
+
+from . import buffers
+
+
+class ReadingFilter():
+    # Names of constructor parameters, in the order used by the USB `FL` command
+    PARAMETERS: tuple[str, ...] = ()
+
+    def update(self, value: float) -> float:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+    def set_integer_input(self) -> None:
+        # Called for a stage which gets raw ADC codes, i.e. ints, instead of outputs of another stage
+        pass
+
+
+def validate_number(value, name: str) -> float:
+    number = float(value)
+    if not isfinite(number):
+        raise ValueError(f"Filter parameter `{name}` must be a finite number, not {value}")
+
+    return number
+
+
+def validate_window(value, max_window: int, name: str) -> int:
+    number = validate_number(value, name)
+    if number != int(number) or number < 1 or number > max_window:
+        raise ValueError(f"{name} window must be an integer in range 1-{max_window}, not {value}")
+
+    return int(number)
+
+
+class MovingAverageFilter(ReadingFilter):
+    PARAMETERS = ("window",)
+    MAX_WINDOW = 2048
+
+    def __init__(self, window: int) -> None:
+        self.window = validate_window(window, self.MAX_WINDOW, "Moving average")
+
+        # Outputs of earlier float stages are kept as they are
+        self.buffer = buffers.ReadingsRingBuffer(self.window, typecode="f")
+
+    def set_integer_input(self) -> None:
+        # Raw ADC codes keep an exact integer sum
+        self.buffer = buffers.ReadingsRingBuffer(self.window)
+
+    def update(self, value: float) -> float:
+        buffer = self.buffer
+        buffer.append(value)
+
+        if buffer.head == 0 and buffer.typecode == "f":
+            # Float sum picks up rounding errors from every add/subtract pair, it is recomputed once per window
+            buffer.sum = sum(buffer.buffer)
+
+        return buffer.mean()
+
+    def reset(self) -> None:
+        self.buffer.clear()
+
+
+class ExponentialMovingAverageFilter(ReadingFilter):
+    PARAMETERS = ("alpha",)
+
+    def __init__(self, alpha: float) -> None:
+        alpha = validate_number(alpha, "alpha")
+        if alpha <= 0 or alpha > 1:
+            raise ValueError(f"EMA alpha must be in range (0, 1], not {alpha}")
+
+        self.alpha = alpha
+        self.value: float | None = None
+
+    def update(self, value: float) -> float:
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+
+        return self.value
+
+    def reset(self) -> None:
+        self.value = None
+
+
+class MedianFilter(ReadingFilter):
+    PARAMETERS = ("window",)
+    MAX_WINDOW = 63
+
+    def __init__(self, window: int) -> None:
+        window = validate_window(window, self.MAX_WINDOW, "Median")
+
+        self.window = window
+
+        # Readings in arrival order and the same readings kept sorted,
+        # the oldest one is found with a binary search and replaced by the newest
+        self.buffer = buffers.ReadingsRingBuffer(window, typecode="f")
+        self.sorted = array("f", (0 for _ in range(window)))
+
+    def _bisect(self, value: float, count: int) -> int:
+        low = 0
+        high = count
+        while low < high:
+            middle = (low + high) >> 1
+            if self.sorted[middle] < value:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def update(self, value: float) -> float:
+        sorted_ = self.sorted
+        count = self.buffer.count
+
+        if count == self.window:
+            # Drop the oldest reading from the sorted window
+            oldest = self.buffer.buffer[self.buffer.head]
+            i = self._bisect(oldest, count)
+            for j in range(i, count - 1):
+                sorted_[j] = sorted_[j + 1]
+            count -= 1
+
+        self.buffer.append(value)
+
+        i = self._bisect(value, count)
+        for j in range(count, i, -1):
+            sorted_[j] = sorted_[j - 1]
+        sorted_[i] = value
+        count += 1
+
+        middle = count >> 1
+        if count & 1:
+            return sorted_[middle]
+        return (sorted_[middle - 1] + sorted_[middle]) / 2
+
+    def reset(self) -> None:
+        self.buffer.clear()
+
+
+class LowPassFilter(ReadingFilter):
+    # Second order Butterworth IIR (biquad), cutoff is a fraction of the sample rate
+    PARAMETERS = ("cutoff",)
+
+    def __init__(self, cutoff: float) -> None:
+        cutoff = validate_number(cutoff, "cutoff")
+        if cutoff <= 0 or cutoff >= 0.5:
+            raise ValueError(f"Low-pass cutoff must be in range (0, 0.5) of the sample rate, not {cutoff}")
+
+        # Bilinear transform with frequency prewarping
+        k = tan(pi * cutoff)
+        norm = 1 / (1 + sqrt(2) * k + k * k)
+
+        self.b0 = k * k * norm
+        self.b1 = 2 * self.b0
+        self.b2 = self.b0
+        self.a1 = 2 * (k * k - 1) * norm
+        self.a2 = (1 - sqrt(2) * k + k * k) * norm
+
+        self.reset()
+
+    def update(self, value: float) -> float:
+        if not self.is_primed:
+            # Start from steady state, otherwise the output ramps up from zero
+            self.x1 = self.x2 = self.y1 = self.y2 = value
+            self.is_primed = True
+
+        y = self.b0 * value + self.b1 * self.x1 + self.b2 * self.x2 - self.a1 * self.y1 - self.a2 * self.y2
+
+        self.x2 = self.x1
+        self.x1 = value
+        self.y2 = self.y1
+        self.y1 = y
+
+        return y
+
+    def reset(self) -> None:
+        self.is_primed = False
+        self.x1 = self.x2 = self.y1 = self.y2 = 0.0
+
+
+class KalmanFilter(ReadingFilter):
+    # Constant value model, noise variances are in squared ADC codes
+    PARAMETERS = ("process_noise", "measurement_noise")
+
+    def __init__(self, process_noise: float, measurement_noise: float) -> None:
+        process_noise = validate_number(process_noise, "process_noise")
+        measurement_noise = validate_number(measurement_noise, "measurement_noise")
+        if process_noise < 0 or measurement_noise <= 0:
+            raise ValueError(f"Kalman process noise must be non-negative and measurement noise positive, not {process_noise}, {measurement_noise}")
+
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.reset()
+
+    def update(self, value: float) -> float:
+        if self.estimate is None:
+            self.estimate = value
+            self.error = self.measurement_noise
+            return value
+
+        error = self.error + self.process_noise
+        gain = error / (error + self.measurement_noise)
+
+        self.estimate += gain * (value - self.estimate)
+        self.error = (1 - gain) * error
+
+        return self.estimate
+
+    def reset(self) -> None:
+        self.estimate: float | None = None
+        self.error = 0.0
+
+
+FILTER_TYPES: dict[str, type[ReadingFilter]] = {
+    "moving_average": MovingAverageFilter,
+    "ema": ExponentialMovingAverageFilter,
+    "median": MedianFilter,
+    "lowpass": LowPassFilter,
+    "kalman": KalmanFilter,
+}
+
+
+class FilterChain():
+    """
+    Filter stages applied in order to every new raw reading, each stage is updated incrementally
+    """
+
+    def __init__(self, stages: tuple[ReadingFilter, ...]) -> None:
+        self.stages = stages
+
+        # Only the first stage gets raw readings
+        if len(stages) > 0:
+            stages[0].set_integer_input()
+
+    def __len__(self) -> int:
+        return len(self.stages)
+
+    def update(self, value: float) -> float:
+        for stage in self.stages:
+            value = stage.update(value)
+        return value
+
+    def reset(self) -> None:
+        for stage in self.stages:
+            stage.reset()
+
+
+def build_filter(spec: dict) -> ReadingFilter:
+    filter_type = FILTER_TYPES.get(spec.get("type")) # type: ignore
+    if filter_type is None:
+        raise ValueError(f"Invalid filter type `{spec.get('type')}`, not in `{set(FILTER_TYPES.keys())}`")
+
+    try:
+        kwargs = dict((name, spec[name]) for name in filter_type.PARAMETERS)
+    except KeyError:
+        raise ValueError(f"Filter `{spec['type']}` requires parameters {filter_type.PARAMETERS}")
+
+    return filter_type(**kwargs)
+
+
+def build_filter_chain(specs: list[dict]) -> FilterChain:
+    return FilterChain(tuple(build_filter(spec) for spec in specs))
+
+
+def parse_filter_specs(text: str) -> list[dict]:
+    # "median:5,ema:0.2" -> [{"type": "median", "window": 5}, {"type": "ema", "alpha": 0.2}]
+    specs = []
+
+    if text in ("", "none", "None"):
+        return specs
+
+    for stage in text.split(","):
+        words = stage.split(":")
+        filter_type = FILTER_TYPES.get(words[0])
+
+        if filter_type is None:
+            raise ValueError(f"Invalid filter type `{words[0]}`, not in `{set(FILTER_TYPES.keys())}`")
+
+        if len(words) - 1 != len(filter_type.PARAMETERS):
+            raise ValueError(f"Filter `{words[0]}` requires parameters {filter_type.PARAMETERS}")
+
+        spec = {"type": words[0]}
+        for name, value in zip(filter_type.PARAMETERS, words[1:]):
+            number = validate_number(value, name)
+            spec[name] = int(number) if number == int(number) else number
+        specs.append(spec)
+
+    # Validates parameter values
+    build_filter_chain(specs)
+
+    return specs
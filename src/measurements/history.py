@@ -0,0 +1,154 @@
+from array import array
+
+
+class SampleRing():
+    """
+    Full rate history of one channel, timestamps in seconds and temperatures in Celsius
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError(f"Capacity must be positive, not {capacity}")
+
+        self.capacity = capacity
+        self.timestamps = array("l", (0 for _ in range(capacity)))
+        self.values = array("f", (0 for _ in range(capacity)))
+
+        # Index where the next sample will be written
+        self.head: int = 0
+        self.count: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, timestamp: int, value: float) -> None:
+        self.timestamps[self.head] = timestamp
+        self.values[self.head] = value
+
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def index(self, age: int) -> int:
+        # Age 0 is the newest sample
+        if not 0 <= age < self.count:
+            raise IndexError(f"No sample of age {age}")
+
+        return (self.head - 1 - age) % self.capacity
+
+    def record(self, age: int) -> tuple:
+        i = self.index(age)
+        return (self.timestamps[i], self.values[i])
+
+
+class RollupRing():
+    """
+    Min/mean/max of fixed length periods, the period in progress is accumulated incrementally
+    and moved into the ring once a sample from a later period arrives
+    """
+
+    def __init__(self, period_s: int, capacity: int) -> None:
+        if capacity < 1 or period_s < 1:
+            raise ValueError(f"Period and capacity must be positive, not {period_s}, {capacity}")
+
+        self.period_s = period_s
+        self.capacity = capacity
+
+        self.timestamps = array("l", (0 for _ in range(capacity)))
+        self.minimums = array("f", (0 for _ in range(capacity)))
+        self.means = array("f", (0 for _ in range(capacity)))
+        self.maximums = array("f", (0 for _ in range(capacity)))
+
+        self.head: int = 0
+        self.count: int = 0
+
+        # Period in progress
+        self.period_start: int | None = None
+        self.period_min: float = 0
+        self.period_max: float = 0
+        self.period_sum: float = 0
+        self.period_count: int = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, timestamp: int, value: float) -> None:
+        period_start = timestamp - timestamp % self.period_s
+
+        if period_start != self.period_start:
+            self.close_period()
+            self.period_start = period_start
+            self.period_min = value
+            self.period_max = value
+            self.period_sum = 0
+            self.period_count = 0
+
+        if value < self.period_min:
+            self.period_min = value
+        if value > self.period_max:
+            self.period_max = value
+
+        self.period_sum += value
+        self.period_count += 1
+
+    def close_period(self) -> None:
+        if self.period_start is None or self.period_count == 0:
+            return
+
+        head = self.head
+        self.timestamps[head] = self.period_start
+        self.minimums[head] = self.period_min
+        self.means[head] = self.period_sum / self.period_count
+        self.maximums[head] = self.period_max
+
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def index(self, age: int) -> int:
+        if not 0 <= age < self.count:
+            raise IndexError(f"No period of age {age}")
+
+        return (self.head - 1 - age) % self.capacity
+
+    def record(self, age: int) -> tuple:
+        i = self.index(age)
+        return (self.timestamps[i], self.minimums[i], self.means[i], self.maximums[i])
+
+
+class MeasurementHistory():
+    """
+    Per channel history kept in RAM, a full rate ring plus 1 minute and 1 hour rollups.
+    All buffers are allocated up front, so memory use does not grow at runtime
+    """
+
+    FULL_RATE = "FR"
+    MINUTES = "MN"
+    HOURS = "HR"
+    TIERS = (FULL_RATE, MINUTES, HOURS)
+
+    def __init__(self, num_of_channels: int, full_rate_size: int, minutes_size: int, hours_size: int) -> None:
+        self.channels: list[dict] = [
+            {
+                self.FULL_RATE: SampleRing(full_rate_size),
+                self.MINUTES: RollupRing(60, minutes_size),
+                self.HOURS: RollupRing(3600, hours_size),
+            } for _ in range(num_of_channels)
+        ]
+
+    def add(self, global_channel_id: int, timestamp: int, temperature_C: float) -> None:
+        tiers = self.channels[global_channel_id]
+
+        tiers[self.FULL_RATE].append(timestamp, temperature_C)
+        tiers[self.MINUTES].add(timestamp, temperature_C)
+        tiers[self.HOURS].add(timestamp, temperature_C)
+
+    def count(self, global_channel_id: int, tier: str) -> int:
+        return len(self.channels[global_channel_id][tier])
+
+    def read(self, global_channel_id: int, tier: str, offset: int, count: int) -> list[tuple]:
+        # Newest first, `offset` skips that many newest records
+        ring = self.channels[global_channel_id][tier]
+
+        stop = min(offset + count, len(ring))
+        return [ring.record(age) for age in range(offset, stop)]
@@ -0,0 +1,165 @@
+import os
+import json
+import struct
+
+
+class MeasurementLogger():
+    """
+    Append-only binary log of measurements kept in rotating segment files.
+    Records are packed into a RAM buffer and written one filesystem block at a time, so littlefs never
+    has to copy a partially written block. When the number of segments exceeds the cap, the oldest one is removed.
+    Up to one block of records is lost on power failure
+    """
+
+    # timestamp_s, global_channel_id, reserved, raw code, temperature_C
+    RECORD_FORMAT = "<IHHif"
+    RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+    # Size of a littlefs block on RP2040
+    FLUSH_SIZE = 4096
+
+    SEGMENT_PREFIX = "log_"
+    SEGMENT_SUFFIX = ".bin"
+
+    def __init__(self, directory: str, segment_size: int, max_segments: int) -> None:
+        if segment_size < self.FLUSH_SIZE or segment_size % self.FLUSH_SIZE != 0:
+            raise ValueError(f"Segment size must be a multiple of {self.FLUSH_SIZE}, not {segment_size}")
+        if max_segments < 1:
+            raise ValueError(f"Max segments must be positive, not {max_segments}")
+
+        self.directory = directory
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+
+        self.buffer = bytearray(self.FLUSH_SIZE)
+        self.buffer_view = memoryview(self.buffer)
+        self.buffer_fill: int = 0
+
+        self._record_buffer = bytearray(self.RECORD_SIZE)
+
+        self.bytes_written: int = 0
+        self.num_of_flushes: int = 0
+
+        try:
+            os.mkdir(directory)
+        except OSError:
+            # Already exists
+            pass
+
+        self.segments: list[int] = self.find_segments()
+        if len(self.segments) == 0:
+            self.segments.append(0)
+
+        self.segment_fill: int = self.get_segment_size(self.segments[-1])
+        if self.segment_fill >= self.segment_size:
+            self.rotate()
+
+    def find_segments(self) -> list[int]:
+        segments = []
+        for filename in os.listdir(self.directory):
+            if filename.startswith(self.SEGMENT_PREFIX) and filename.endswith(self.SEGMENT_SUFFIX):
+                try:
+                    segments.append(int(filename[len(self.SEGMENT_PREFIX):-len(self.SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+
+        segments.sort()
+        return segments
+
+    def get_segment_path(self, segment: int) -> str:
+        return f"{self.directory}/{self.SEGMENT_PREFIX}{segment:06d}{self.SEGMENT_SUFFIX}"
+
+    def get_segment_size(self, segment: int) -> int:
+        try:
+            size = os.stat(self.get_segment_path(segment))[6]
+        except OSError:
+            return 0
+
+        # A torn write may leave a partial record at the end
+        return size - size % self.RECORD_SIZE
+
+    def log(self, timestamp: int, global_channel_id: int, raw_code: int, temperature_C: float) -> None:
+        struct.pack_into(self.RECORD_FORMAT, self.buffer, self.buffer_fill, timestamp, global_channel_id, 0, raw_code, temperature_C)
+        self.buffer_fill += self.RECORD_SIZE
+
+        if self.buffer_fill + self.RECORD_SIZE > self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.buffer_fill == 0:
+            return
+
+        with open(self.get_segment_path(self.segments[-1]), "ab") as f:
+            f.write(self.buffer_view[:self.buffer_fill])
+
+        self.segment_fill += self.buffer_fill
+        self.bytes_written += self.buffer_fill
+        self.num_of_flushes += 1
+        self.buffer_fill = 0
+
+        if self.segment_fill >= self.segment_size:
+            self.rotate()
+
+    def rotate(self) -> None:
+        self.segments.append(self.segments[-1] + 1)
+        self.segment_fill = 0
+
+        while len(self.segments) > self.max_segments:
+            oldest = self.segments.pop(0)
+            try:
+                os.remove(self.get_segment_path(oldest))
+            except OSError:
+                pass
+
+    def count(self) -> int:
+        num_of_bytes = self.buffer_fill + self.segment_fill
+        for segment in self.segments[:-1]:
+            num_of_bytes += self.get_segment_size(segment)
+
+        return num_of_bytes // self.RECORD_SIZE
+
+    def read(self, offset: int, count: int) -> list[tuple]:
+        # Newest first, `offset` skips that many newest records, records still in RAM are included
+        records = []
+
+        buffered = self.buffer_fill // self.RECORD_SIZE
+        while offset < buffered and len(records) < count:
+            records.append(struct.unpack_from(self.RECORD_FORMAT, self.buffer, (buffered - 1 - offset) * self.RECORD_SIZE))
+            offset += 1
+        offset -= buffered
+
+        for segment in reversed(self.segments):
+            if len(records) >= count:
+                break
+
+            if segment == self.segments[-1]:
+                num_of_records = self.segment_fill // self.RECORD_SIZE
+            else:
+                num_of_records = self.get_segment_size(segment) // self.RECORD_SIZE
+
+            if offset >= num_of_records:
+                offset -= num_of_records
+                continue
+
+            with open(self.get_segment_path(segment), "rb") as f:
+                while offset < num_of_records and len(records) < count:
+                    f.seek((num_of_records - 1 - offset) * self.RECORD_SIZE)
+                    f.readinto(self._record_buffer)
+                    records.append(struct.unpack(self.RECORD_FORMAT, self._record_buffer))
+                    offset += 1
+
+            offset = 0
+
+        return records
+
+    def page_asjson(self, offset: int, count: int) -> str:
+        records = [
+            {
+                "timestamp": timestamp,
+                "channel": global_channel_id,
+                "raw_code": raw_code,
+                "temperature_C": temperature_C,
+            } for timestamp, global_channel_id, _, raw_code, temperature_C in self.read(offset, count)
+        ]
+
+        return json.dumps({"total": self.count(), "offset": offset, "records": records})
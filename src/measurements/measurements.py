@@ -1,7 +1,8 @@
 from machine import Pin, SPI, ADC
 
-from measurements import controllers as ct, sensors as s, channels as ch, ADCs, queries as q
+from measurements import controllers as ct, sensors as s, channels as ch, ADCs, queries as q, history as h, logger as lg
 import app
+from device_config import __DeviceConfig
 
 
 def initialize_measurements(app_state: app.AppState, app_config: app.AppConfig) -> ct.MeasurementController:
@@ -35,14 +36,39 @@ def initialize_measurements(app_state: app.AppState, app_config: app.AppConfig)
     ads124S08.initialize(spi_object=spi, CS_pin_id=5)
 
 
+    # Order must match `adc_id` used in `__DeviceConfig.CHANNEL_ROUTING`
+    ADC_objects = (
+        ads124S08,
+    )
+
+    if len(ADC_objects) != __DeviceConfig.NUM_OF_ADCs:
+        raise Exception(f"Expected {__DeviceConfig.NUM_OF_ADCs} ADCs, but {len(ADC_objects)} were initialized")
+
+    app_state.measurement_history = h.MeasurementHistory(
+        num_of_channels=__DeviceConfig.NUM_OF_CHANNELS,
+        full_rate_size=__DeviceConfig.HISTORY_FULL_RATE_SIZE,
+        minutes_size=__DeviceConfig.HISTORY_MINUTES_SIZE,
+        hours_size=__DeviceConfig.HISTORY_HOURS_SIZE,
+    )
+
+    app_state.measurement_logger = lg.MeasurementLogger(
+        directory=__DeviceConfig.LOG_DIRECTORY,
+        segment_size=__DeviceConfig.LOG_SEGMENT_SIZE,
+        max_segments=__DeviceConfig.LOG_MAX_SEGMENTS,
+    )
+
     mc = ct.MeasurementController(
-        ADC_objects=(
-            ads124S08,
-        ),
+        ADC_objects=ADC_objects,
+        routing=__DeviceConfig.CHANNEL_ROUTING,
         config=app_config.channel_config,
         processor=ct.MeasurementProcessor(
             config=app_config.channel_config,
-        )
+            fixed_point=app_config.other_config["fixed_point_enabled"],
+        ),
+        continuous_mode=app_config.other_config["continuous_mode_enabled"],
+        history=app_state.measurement_history,
+        logger=app_state.measurement_logger,
+        logging_enabled=app_config.other_config["logging_enabled"],
     )
 
 
@@ -1,72 +1,56 @@
-from . import sensors
-
-class MeasurementQuery():
-    def __init__(self, global_channel_id: int, adc_id: int, adc_channel_id: int, probe: type[sensors.SensorProbe], num_of_readings: int, **kwargs) -> None:
-        self._global_channel_id = global_channel_id
-        self._adc_id = adc_id
-        self._adc_channel_id = adc_channel_id
-        self._probe = probe
-        self._num_of_readings = num_of_readings
-        self._extra_attrs = kwargs
-
-    @property
-    def global_channel_id(self):
-        return self._global_channel_id
-
-    @property
-    def adc_id(self):
-        return self._adc_id
-
-    @property
-    def adc_channel_id(self):
-        return self._adc_channel_id
-    
-    @property
-    def probe(self):
-        return self._probe
-
-    @property
-    def num_of_readings(self):
-        return self._num_of_readings
-    
-    @property
-    def extra_attrs(self):
-        return self._extra_attrs
-    
-
-
-class QueryResponseStatus():
-    pass
-class ADC_ACCEPT(QueryResponseStatus):
-    pass
-class ADC_WAITING_FOR_CONVERSION(QueryResponseStatus):
-    pass
-class ADC_DATA_READY(QueryResponseStatus):
-    pass
-class ADC_REFUSE(QueryResponseStatus):
-    pass
-class ADC_CONVERSION_TIMEOUT(QueryResponseStatus):
-    pass
-
-class MeasurementResponse():
-    def __init__(self, query_in_progress: MeasurementQuery | None, status: type[QueryResponseStatus], readings: list | None=None, message: str|None=None) -> None:
-        self._query_in_progress = query_in_progress
-        self._status = status
-        self._readings = readings
-        self._message = message
-
-    @property
-    def query_in_progress(self):
-        return self._query_in_progress
-
-    @property
-    def status(self):
-        return self._status
-
-    @property
-    def readings(self):
-        return self._readings
-    
-    @property
-    def message(self):
-        return self._message
+from . import sensors
+
+class MeasurementQuery():
+    # One query object is kept per channel and refreshed with `update()`, so polling allocates nothing
+    __slots__ = ("global_channel_id", "adc_id", "adc_channel_id", "probe", "num_of_readings", "acquisition_profile", "extra_attrs")
+
+    def __init__(self, global_channel_id: int, adc_id: int, adc_channel_id: int, probe: type[sensors.SensorProbe], num_of_readings: int, acquisition_profile: str="default", extra_attrs: dict | None=None) -> None:
+        self.global_channel_id = global_channel_id
+        self.adc_id = adc_id
+        self.adc_channel_id = adc_channel_id
+        self.probe = probe
+        self.num_of_readings = num_of_readings
+        self.acquisition_profile = acquisition_profile
+        self.extra_attrs = extra_attrs if extra_attrs is not None else {}
+
+    def update(self, probe: type[sensors.SensorProbe], num_of_readings: int, acquisition_profile: str, extra_attrs: dict) -> "MeasurementQuery":
+        self.probe = probe
+        self.num_of_readings = num_of_readings
+        self.acquisition_profile = acquisition_profile
+        self.extra_attrs = extra_attrs
+
+        return self
+
+
+# Response statuses are small ints, so reporting one does not allocate
+ADC_ACCEPT = 0
+ADC_WAITING_FOR_CONVERSION = 1
+ADC_DATA_READY = 2
+ADC_REFUSE = 3
+ADC_CONVERSION_TIMEOUT = 4
+
+STATUS_NAMES = ("ADC_ACCEPT", "ADC_WAITING_FOR_CONVERSION", "ADC_DATA_READY", "ADC_REFUSE", "ADC_CONVERSION_TIMEOUT")
+
+class MeasurementResponse():
+    """
+    Each ADC owns a single response and overwrites it with `set()` on every `measure()` call.
+    Valid readings are `readings[:num_of_readings]`, they stay valid until the ADC returns ADC_DATA_READY again
+    """
+
+    __slots__ = ("query_in_progress", "status", "readings", "num_of_readings", "message")
+
+    def __init__(self) -> None:
+        self.query_in_progress: MeasurementQuery | None = None
+        self.status: int = ADC_ACCEPT
+        self.readings = None
+        self.num_of_readings: int = 0
+        self.message: str | None = None
+
+    def set(self, query_in_progress: MeasurementQuery | None, status: int, readings=None, num_of_readings: int=0, message: str | None=None) -> "MeasurementResponse":
+        self.query_in_progress = query_in_progress
+        self.status = status
+        self.readings = readings
+        self.num_of_readings = num_of_readings
+        self.message = message
+
+        return self
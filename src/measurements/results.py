@@ -0,0 +1,92 @@
+import json
+
+from . import sensors
+
+
+class ChannelResult():
+    """
+    Processed values of one channel in fixed-point mode, updated in place on every measurement.
+    Resistance and temperatures are kept as integer milli-units, float values in other units are derived only when read.
+    Supports the read-only part of the dict interface used by the float pipeline (`result["temperature_C"]`)
+    """
+
+    __slots__ = ("_name", "verbose_name", "probe", "avg_reading", "resistance_mOm", "temperature_mC")
+
+    KEYS = ("_name", "verbose_name", "probe", "avg_reading", "resistance_Om", "temperature_C", "temperature_K", "temperature_F")
+
+    def __init__(self) -> None:
+        self._name: str = ""
+        self.verbose_name: str = ""
+        self.probe: type[sensors.SensorProbe] = sensors.SensorProbe
+        self.avg_reading: int = 0
+        self.resistance_mOm: int = 0
+        self.temperature_mC: int = 0
+
+    @property
+    def resistance_Om(self) -> float:
+        return self.resistance_mOm / 1000
+
+    @property
+    def temperature_C(self) -> float:
+        return self.temperature_mC / 1000
+
+    @property
+    def temperature_K(self) -> float:
+        return self.probe.celsius_to_kelvin(self.temperature_C)
+
+    @property
+    def temperature_F(self) -> float:
+        return self.probe.celsius_to_fahrenheit(self.temperature_C)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+
+        return getattr(self, key)
+
+    def asdict(self) -> dict:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    def copy_from(self, other: "ChannelResult") -> "ChannelResult":
+        self._name = other._name
+        self.verbose_name = other.verbose_name
+        self.probe = other.probe
+        self.avg_reading = other.avg_reading
+        self.resistance_mOm = other.resistance_mOm
+        self.temperature_mC = other.temperature_mC
+
+        return self
+
+
+class ResultsSnapshot():
+    """
+    Immutable view of all channel results at one version, probes are already converted to text.
+    Serialized forms are built on first use and cached, so repeated reads of the same version cost nothing
+    """
+
+    __slots__ = ("version", "results", "_json", "_bytes")
+
+    def __init__(self, version: int, results: tuple) -> None:
+        self.version = version
+        self.results = results
+
+        self._json: str | None = None
+        self._bytes: bytes | None = None
+
+    def asjson(self) -> str:
+        if self._json is None:
+            self._json = json.dumps(self.results)
+
+        return self._json
+
+    def asbytes(self) -> bytes:
+        if self._bytes is None:
+            self._bytes = self.asjson().encode()
+
+        return self._bytes
+
+
+EMPTY_SNAPSHOT = ResultsSnapshot(-1, ())
@@ -0,0 +1,113 @@
+import utime
+from heapq import heappush, heappop
+
+
+class ChannelScheduler():
+    """
+    Channels of one ADC kept in a heap ordered by the time their next measurement is due.
+    Due times live on a private millisecond timeline, unlike ticks_ms it does not wrap, so heap order stays valid
+    """
+
+    # Timeline is shifted back before its values stop being small ints
+    REBASE_THRESHOLD_MS = 1 << 29
+
+    def __init__(self, num_of_channels: int) -> None:
+        # Entries are (due_ms, global_channel_id)
+        self.heap: list[tuple[int, int]] = []
+
+        self.is_member = [False]*num_of_channels
+        self.is_scheduled = [False]*num_of_channels
+        self.due_times_ms = [0]*num_of_channels
+
+        # How late a channel was picked against its deadline
+        self.last_lateness_ms = [0]*num_of_channels
+        self.max_lateness_ms = [0]*num_of_channels
+        self.total_lateness_ms = [0]*num_of_channels
+        self.num_of_picks = [0]*num_of_channels
+
+        self._last_ticks_ms = utime.ticks_ms()
+        self._elapsed_ms = 0
+
+    def now(self) -> int:
+        ticks_ms = utime.ticks_ms()
+        self._elapsed_ms += utime.ticks_diff(ticks_ms, self._last_ticks_ms)
+        self._last_ticks_ms = ticks_ms
+
+        if self._elapsed_ms > self.REBASE_THRESHOLD_MS:
+            self.rebase(self._elapsed_ms)
+
+        return self._elapsed_ms
+
+    def rebase(self, offset_ms: int) -> None:
+        self._elapsed_ms -= offset_ms
+        self.heap = [(due_ms - offset_ms, global_channel_id) for due_ms, global_channel_id in self.heap]
+        for global_channel_id in range(len(self.due_times_ms)):
+            self.due_times_ms[global_channel_id] -= offset_ms
+
+    def ticks_to_time(self, ticks_ms: int) -> int:
+        return self.now() - utime.ticks_diff(self._last_ticks_ms, ticks_ms)
+
+    def set_channels(self, channels: list[tuple[int, int]], in_flight: tuple=()) -> None:
+        # `channels` are (global_channel_id, due ticks_ms), channels in flight are added back on completion
+        self.heap = []
+        for global_channel_id in range(len(self.is_member)):
+            self.is_member[global_channel_id] = False
+            self.is_scheduled[global_channel_id] = False
+
+        now = self.now()
+        for global_channel_id, due_ticks_ms in channels:
+            self.is_member[global_channel_id] = True
+
+            if global_channel_id not in in_flight:
+                # Time a channel spent disabled or unscheduled does not count as lateness
+                self.schedule(global_channel_id, max(self.ticks_to_time(due_ticks_ms), now))
+
+    def schedule(self, global_channel_id: int, due_ms: int) -> None:
+        if not self.is_member[global_channel_id] or self.is_scheduled[global_channel_id]:
+            return
+
+        self.is_scheduled[global_channel_id] = True
+        self.due_times_ms[global_channel_id] = due_ms
+        heappush(self.heap, (due_ms, global_channel_id))
+
+    def complete(self, global_channel_id: int, interval_ms: int) -> None:
+        self.schedule(global_channel_id, self.now() + interval_ms)
+
+    def pop_due(self) -> int | None:
+        if len(self.heap) == 0:
+            return None
+
+        now = self.now()
+
+        due_ms, global_channel_id = self.heap[0]
+        if due_ms > now:
+            return None
+
+        heappop(self.heap)
+        self.is_scheduled[global_channel_id] = False
+
+        lateness_ms = now - due_ms
+        self.last_lateness_ms[global_channel_id] = lateness_ms
+        self.total_lateness_ms[global_channel_id] += lateness_ms
+        self.num_of_picks[global_channel_id] += 1
+        if lateness_ms > self.max_lateness_ms[global_channel_id]:
+            self.max_lateness_ms[global_channel_id] = lateness_ms
+
+        return global_channel_id
+
+    def get_wait_ms(self) -> int | None:
+        # Time until the earliest channel is due, None when nothing is scheduled
+        if len(self.heap) == 0:
+            return None
+
+        return max(self.heap[0][0] - self.now(), 0)
+
+    def get_stats(self, global_channel_id: int) -> dict:
+        num_of_picks = self.num_of_picks[global_channel_id]
+
+        return {
+            "last_lateness_ms": self.last_lateness_ms[global_channel_id],
+            "max_lateness_ms": self.max_lateness_ms[global_channel_id],
+            "avg_lateness_ms": self.total_lateness_ms[global_channel_id] / num_of_picks if num_of_picks else 0,
+            "num_of_picks": num_of_picks,
+        }
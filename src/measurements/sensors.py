@@ -1,4 +1,25 @@
+from math import exp, log
+
+# Callendar-Van Dusen coefficients for platinum RTDs (IEC 60751)
+CVD_A = 3.9083e-3
+CVD_B = -5.7750e-7
+CVD_C = -4.183e-12
+
+
+def callendar_van_dusen(T_c: float, R0: float) -> float:
+    if T_c < 0:
+        return R0 * (1 + CVD_A * T_c + CVD_B * T_c**2 + CVD_C * (T_c - 100) * T_c**3)
+    return R0 * (1 + CVD_A * T_c + CVD_B * T_c**2)
+
+
 class SensorProbe():
+    # (min, max, step) in Celsius of the raw code -> temperature lookup table, None if the probe has none
+    TABLE_RANGE_CELSIUS: tuple | None = None
+
+    @staticmethod
+    def calculate_resistance_ohm(T_c: float) -> float:
+        raise NotImplementedError
+
     @staticmethod
     def celsius_to_fahrenheit(T_c: float) -> float:
         return (T_c * 1.8) + 32
@@ -8,6 +29,11 @@ class SensorProbe():
         return T_c + 273.15
 
 class SensorPt100(SensorProbe):
+    TABLE_RANGE_CELSIUS = (-200, 850, 5)
+
+    @staticmethod
+    def calculate_resistance_ohm(T_c: float) -> float:
+        return callendar_van_dusen(T_c, 100)
 
     @staticmethod
     def calculate_temperature_celsius(probe_resistance: float) -> float:
@@ -24,6 +50,12 @@ class SensorPt100(SensorProbe):
 
 
 class SensorPt1000(SensorProbe):
+    TABLE_RANGE_CELSIUS = (-200, 850, 5)
+
+    @staticmethod
+    def calculate_resistance_ohm(T_c: float) -> float:
+        return callendar_van_dusen(T_c, 1000)
+
     @staticmethod
     def calculate_temperature_celsius(probe_resistance: float) -> float:
         A = 3.9083e-3
@@ -38,4 +70,50 @@ class SensorPt1000(SensorProbe):
             return (-R0 * A + (R0**2 * A**2 - 4*R0*B * (R0 - R ))**0.5) / (2*R0*B)
     
 class SensorNTC(SensorProbe):
-    pass
\ No newline at end of file
+    """
+    NTC thermistor described by the Beta model, or by the Steinhart-Hart equation when its coefficients are set.
+    Subclass and override the model constants for other thermistors.
+    The model is only evaluated when the lookup table is compiled, with a 1 °C step the table is within 0.01 °C of the model.
+    On the ratiometric ADS124S08 front end resistances up to 2*RRef (4 kOhm) are in range,
+    which covers about -3 °C to 125 °C for the default 1 kOhm B3950 thermistor
+    """
+
+    TABLE_RANGE_CELSIUS = (-40, 125, 1)
+
+    R25 = 1000
+    BETA = 3950
+    # (A, B, C) of 1/T = A + B*ln(R) + C*ln(R)**3, None to use the Beta model
+    STEINHART_HART: tuple | None = None
+
+    T25_K = 298.15
+
+    @classmethod
+    def calculate_resistance_ohm(cls, T_c: float) -> float:
+        T_k = cls.celsius_to_kelvin(T_c)
+
+        if cls.STEINHART_HART is None:
+            return cls.R25 * exp(cls.BETA * (1/T_k - 1/cls.T25_K))
+
+        A, B, C = cls.STEINHART_HART
+        y = (A - 1/T_k) / (2*C)
+        x = ((B / (3*C))**3 + y**2)**0.5
+
+        return exp(cube_root(x - y) - cube_root(x + y))
+
+    @classmethod
+    def calculate_temperature_celsius(cls, probe_resistance: float) -> float:
+        ln_R = log(probe_resistance)
+
+        if cls.STEINHART_HART is None:
+            T_k = 1 / (1/cls.T25_K + (ln_R - log(cls.R25)) / cls.BETA)
+        else:
+            A, B, C = cls.STEINHART_HART
+            T_k = 1 / (A + B*ln_R + C*ln_R**3)
+
+        return T_k - 273.15
+
+
+def cube_root(x: float) -> float:
+    if x < 0:
+        return -((-x)**(1/3))
+    return x**(1/3)
\ No newline at end of file
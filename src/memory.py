@@ -0,0 +1,150 @@
+import gc
+import utime
+
+
+class MemoryPolicy():
+    """
+    Decides when the garbage collector runs. `gc.threshold` is the safety net collecting after a fixed amount of allocations,
+    explicit collections are placed in idle windows reported by the caller, e.g. while an ADC channel settles.
+    No explicit collection starts while a blocker (such as a Modbus frame being received) reports busy
+    """
+
+    # Largest free block is searched down from `mem_free()` in steps of 3/4, the result is a lower bound
+    # and never more than the probe cap, which `get_stats()` reports next to it.
+    # The successful probe stays allocated as garbage until the next collection, so a search
+    # brings that collection forward by up to FRAGMENTATION_PROBE_MAX_BYTES of allocations
+    FRAGMENTATION_STEP_NUMERATOR = 3
+    FRAGMENTATION_STEP_DENOMINATOR = 4
+    FRAGMENTATION_PROBE_MAX_BYTES = 16384
+    MAX_FRAGMENTATION_PROBES = 6
+
+    def __init__(self, threshold_bytes: int, collect_after_bytes: int, max_interval_ms: int, low_memory_bytes: int, fragmentation_interval_ms: int) -> None:
+        # Allocation triggered collection, runs wherever the allocation happens
+        self.threshold_bytes = threshold_bytes
+        # Allocations since the last collection after which an idle window is used
+        self.collect_after_bytes = collect_after_bytes
+        # Longest time between two collections, the next run() collects even without an idle window
+        self.max_interval_ms = max_interval_ms
+        # Below this much free memory collections no longer wait for an idle window
+        self.low_memory_bytes = low_memory_bytes
+        self.fragmentation_interval_ms = fragmentation_interval_ms
+
+        self.blockers: list = []
+        self.probe_blockers: list = []
+
+        self.num_of_collections: int = 0
+        self.num_of_urgent_collections: int = 0
+        self.last_pause_us: int = 0
+        self.max_pause_us: int = 0
+        self.total_pause_us: int = 0
+        self.largest_free_block_at_least: int | None = None
+
+        self._last_collection_ticks_ms: int = utime.ticks_ms()
+        self._last_fragmentation_ticks_ms: int = utime.ticks_ms()
+        self._mem_alloc_after_collection: int = gc.mem_alloc()
+
+        gc.threshold(threshold_bytes)
+
+    def add_blocker(self, is_busy) -> None:
+        # `is_busy()` returns True while a collection pause would break something time-critical
+        self.blockers.append(is_busy)
+
+    def add_probe_blocker(self, is_busy) -> None:
+        # `is_busy()` returns True while `find_largest_free_block()` must not run, e.g. while core 1 allocates
+        self.probe_blockers.append(is_busy)
+
+    def is_blocked(self, blockers: list | None=None) -> bool:
+        for is_busy in self.blockers if blockers is None else blockers:
+            if is_busy():
+                return True
+
+        return False
+
+    def get_expected_pause_ms(self) -> int:
+        if self.num_of_collections == 0:
+            return 1
+
+        return self.total_pause_us // self.num_of_collections // 1000 + 1
+
+    def run(self, idle_ms: int=0) -> bool:
+        # Returns True if a collection was made
+        if self.is_blocked():
+            return False
+
+        is_urgent = (
+            gc.mem_free() < self.low_memory_bytes
+            or utime.ticks_diff(utime.ticks_ms(), self._last_collection_ticks_ms) >= self.max_interval_ms
+        )
+
+        if not is_urgent:
+            if gc.mem_alloc() - self._mem_alloc_after_collection < self.collect_after_bytes:
+                return False
+
+            if idle_ms < self.get_expected_pause_ms():
+                return False
+
+        self.collect()
+
+        if is_urgent:
+            self.num_of_urgent_collections += 1
+
+        if (utime.ticks_diff(utime.ticks_ms(), self._last_fragmentation_ticks_ms) >= self.fragmentation_interval_ms
+            and not is_urgent and not self.is_blocked(self.probe_blockers)):
+            self.largest_free_block_at_least = self.find_largest_free_block()
+            self._last_fragmentation_ticks_ms = utime.ticks_ms()
+
+        return True
+
+    def collect(self) -> None:
+        start = utime.ticks_us()
+        gc.collect()
+        pause_us = utime.ticks_diff(utime.ticks_us(), start)
+
+        self.num_of_collections += 1
+        self.last_pause_us = pause_us
+        self.total_pause_us += pause_us
+        if pause_us > self.max_pause_us:
+            self.max_pause_us = pause_us
+
+        self._last_collection_ticks_ms = utime.ticks_ms()
+        self._mem_alloc_after_collection = gc.mem_alloc()
+
+    def find_largest_free_block(self) -> int:
+        # MicroPython has no call for this, so blocks of decreasing size are allocated until one fits.
+        # A failed allocation would start a collection, with automatic collections disabled it only raises MemoryError.
+        # This also affects allocations on core 1, so the search must not run while it is active, see `add_probe_blocker()`.
+        # The probe is garbage right away and is reclaimed by the next collection, until then it takes up
+        # the free block it was placed in, which is why searches only run right after a collection
+        size = min(gc.mem_free(), self.FRAGMENTATION_PROBE_MAX_BYTES)
+        was_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            for _ in range(self.MAX_FRAGMENTATION_PROBES):
+                if size <= 0:
+                    break
+
+                try:
+                    probe = bytearray(size)
+                    del probe
+                    return size
+                except MemoryError:
+                    size = size * self.FRAGMENTATION_STEP_NUMERATOR // self.FRAGMENTATION_STEP_DENOMINATOR
+        finally:
+            if was_enabled:
+                gc.enable()
+
+        return 0
+
+    def get_stats(self) -> dict:
+        return {
+            "num_of_collections": self.num_of_collections,
+            "num_of_urgent_collections": self.num_of_urgent_collections,
+            "last_pause_us": self.last_pause_us,
+            "max_pause_us": self.max_pause_us,
+            "avg_pause_us": self.total_pause_us // self.num_of_collections if self.num_of_collections else 0,
+            "mem_free": gc.mem_free(),
+            "mem_alloc": gc.mem_alloc(),
+            "largest_free_block_at_least": self.largest_free_block_at_least,
+            "largest_free_block_probe_cap": self.FRAGMENTATION_PROBE_MAX_BYTES,
+        }
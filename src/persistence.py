@@ -0,0 +1,147 @@
+import os
+import utime
+
+
+TEMP_FILE_SUFFIX = ".tmp"
+
+
+def write_atomic(filename: str, data: str|bytes) -> int:
+    # Data goes to a temporary file which then replaces the target,
+    # so a power loss leaves either the old or the new file, never a truncated one
+    temp_filename = filename + TEMP_FILE_SUFFIX
+
+    if isinstance(data, str):
+        with open(temp_filename, "w", encoding="UTF-8") as f:
+            num_of_bytes = f.write(data)
+    else:
+        with open(temp_filename, "wb") as f:
+            num_of_bytes = f.write(data)
+
+    try:
+        os.rename(temp_filename, filename)
+    except OSError:
+        # Filesystems which refuse to rename over an existing file
+        os.remove(filename)
+        os.rename(temp_filename, filename)
+
+    return num_of_bytes
+
+
+class PersistedObject():
+    """
+    Object saved by `PersistenceManager`, it must have an integer `version` attribute incremented on every change
+    and a `save_to_file()` method returning the number of bytes written
+    """
+
+    def __init__(self, name: str, obj, debounce_ms: int, min_interval_ms: int, max_delay_ms: int) -> None:
+        self.name = name
+        self.obj = obj
+
+        # Quiet time after the last change before writing, so a burst of changes results in one write
+        self.debounce_ms = debounce_ms
+        # Shortest time between two writes
+        self.min_interval_ms = min_interval_ms
+        # Longest time a change may wait when changes keep coming
+        self.max_delay_ms = max_delay_ms
+
+        self.saved_version: int = obj.version
+        self.seen_version: int = obj.version
+        self.first_change_ticks_ms: int = 0
+        self.last_change_ticks_ms: int = 0
+        self.last_write_ticks_ms: int = utime.ticks_ms()
+
+        self.num_of_writes: int = 0
+        self.num_of_failures: int = 0
+        self.bytes_written: int = 0
+
+    @property
+    def is_dirty(self) -> bool:
+        return self.obj.version != self.saved_version
+
+
+class PersistenceManager():
+    def __init__(self) -> None:
+        self.objects: list[PersistedObject] = []
+
+        self.bytes_written: int = 0
+        self.num_of_writes: int = 0
+        self.io_time_us: int = 0
+        self.max_io_time_us: int = 0
+
+    def register(self, name: str, obj, debounce_ms: int=0, min_interval_ms: int=0, max_delay_ms: int=0) -> PersistedObject:
+        persisted = PersistedObject(name, obj, debounce_ms, min_interval_ms, max_delay_ms)
+        self.objects.append(persisted)
+
+        return persisted
+
+    def run(self) -> None:
+        now = utime.ticks_ms()
+
+        for persisted in self.objects:
+            version = persisted.obj.version
+
+            if version == persisted.saved_version:
+                continue
+
+            if version != persisted.seen_version:
+                if persisted.seen_version == persisted.saved_version:
+                    persisted.first_change_ticks_ms = now
+                persisted.last_change_ticks_ms = now
+                persisted.seen_version = version
+
+            if utime.ticks_diff(now, persisted.last_write_ticks_ms) < persisted.min_interval_ms:
+                continue
+
+            is_quiet = utime.ticks_diff(now, persisted.last_change_ticks_ms) >= persisted.debounce_ms
+            is_overdue = persisted.max_delay_ms > 0 and utime.ticks_diff(now, persisted.first_change_ticks_ms) >= persisted.max_delay_ms
+
+            if is_quiet or is_overdue:
+                self.save(persisted)
+
+    def save(self, persisted: PersistedObject) -> None:
+        version = persisted.obj.version
+        start_us = utime.ticks_us()
+
+        try:
+            num_of_bytes = persisted.obj.save_to_file()
+        except OSError:
+            # Retried after `min_interval_ms`, the previous file is still intact
+            persisted.num_of_failures += 1
+            persisted.last_write_ticks_ms = utime.ticks_ms()
+            return
+        except Exception:
+            # Same data would fail again, so this version is not retried, the next change is
+            persisted.num_of_failures += 1
+            persisted.saved_version = version
+            persisted.seen_version = version
+            persisted.last_write_ticks_ms = utime.ticks_ms()
+            return
+
+        elapsed_us = utime.ticks_diff(utime.ticks_us(), start_us)
+
+        persisted.saved_version = version
+        persisted.seen_version = version
+        persisted.last_write_ticks_ms = utime.ticks_ms()
+        persisted.num_of_writes += 1
+        persisted.bytes_written += num_of_bytes
+
+        self.num_of_writes += 1
+        self.bytes_written += num_of_bytes
+        self.io_time_us += elapsed_us
+        if elapsed_us > self.max_io_time_us:
+            self.max_io_time_us = elapsed_us
+
+    def flush(self) -> None:
+        # Writes every pending change right away, e.g. before a reset
+        for persisted in self.objects:
+            if persisted.is_dirty:
+                self.save(persisted)
+
+    def get_stats(self) -> dict:
+        return {
+            "bytes_written": self.bytes_written,
+            "num_of_writes": self.num_of_writes,
+            "io_time_ms": self.io_time_us // 1000,
+            "max_io_time_ms": self.max_io_time_us // 1000,
+            "dirty": [persisted.name for persisted in self.objects if persisted.is_dirty],
+        }
@@ -0,0 +1,163 @@
+import gc
+import json
+import utime
+from array import array
+
+
+STAGE_MEASUREMENT = 0
+STAGE_USB = 1
+STAGE_MODBUS = 2
+STAGE_WEB = 3
+STAGE_GC = 4
+STAGE_SAVE = 5
+
+STAGE_NAMES = ("measurement", "usb", "modbus", "web", "gc", "save")
+
+
+class LoopProfiler():
+    """
+    Execution time and allocations of each runtime stage, kept in preallocated arrays so recording allocates nothing.
+    Times go into a histogram with one bucket per power of two microseconds, percentiles are the upper bound of their bucket.
+    Stages spanning an `await` (web requests) include the time other tasks ran in between.
+    Counts, totals and the histogram of a stage are halved once any of them reaches TOTAL_LIMIT,
+    so averages and percentiles follow a decaying window, while min and max cover everything since `reset()`
+    """
+
+    # Bucket i holds times in range [2^i, 2^(i+1)) us, the last one everything above ~8 s
+    NUM_OF_BUCKETS = 24
+
+    # Totals stay below 2^29 and a single sample is clamped to the same limit,
+    # so every sum fits a small int and recording allocates nothing even on long runs
+    TOTAL_LIMIT = 1 << 29
+
+    def __init__(self, enabled: bool=False) -> None:
+        self.enabled = enabled
+
+        n = len(STAGE_NAMES)
+        self.counts = array("L", (0 for _ in range(n)))
+        self.min_us = array("L", (0 for _ in range(n)))
+        self.max_us = array("L", (0 for _ in range(n)))
+        self.total_us = array("L", (0 for _ in range(n)))
+        self.total_alloc = array("L", (0 for _ in range(n)))
+        self.max_alloc = array("L", (0 for _ in range(n)))
+        self.histograms = array("L", (0 for _ in range(n * self.NUM_OF_BUCKETS)))
+
+        self._start_us = array("L", (0 for _ in range(n)))
+        self._start_alloc = array("L", (0 for _ in range(n)))
+
+        self.reset()
+
+    def reset(self) -> None:
+        for stage in range(len(STAGE_NAMES)):
+            self.counts[stage] = 0
+            self.min_us[stage] = 0
+            self.max_us[stage] = 0
+            self.total_us[stage] = 0
+            self.total_alloc[stage] = 0
+            self.max_alloc[stage] = 0
+
+        for i in range(len(self.histograms)):
+            self.histograms[i] = 0
+
+    def begin(self, stage: int) -> None:
+        # One start slot per stage, stages which can be in progress more than once at a time
+        # (web connections) keep their own start values and call `record()`
+        if not self.enabled:
+            return
+
+        self._start_us[stage] = utime.ticks_us()
+        self._start_alloc[stage] = gc.mem_alloc()
+
+    def end(self, stage: int) -> None:
+        if not self.enabled:
+            return
+
+        elapsed_us = utime.ticks_diff(utime.ticks_us(), self._start_us[stage])
+        # A collection inside the stage makes the difference negative
+        allocated = max(gc.mem_alloc() - self._start_alloc[stage], 0)
+
+        self.record(stage, elapsed_us, allocated)
+
+    def record(self, stage: int, elapsed_us: int, allocated: int=0) -> None:
+        if not self.enabled:
+            return
+
+        # ticks_diff is negative once the stage ran longer than half the ticks range
+        if elapsed_us < 0 or elapsed_us >= self.TOTAL_LIMIT:
+            elapsed_us = self.TOTAL_LIMIT - 1
+        if allocated >= self.TOTAL_LIMIT:
+            allocated = self.TOTAL_LIMIT - 1
+
+        count = self.counts[stage]
+        if count == 0 or elapsed_us < self.min_us[stage]:
+            self.min_us[stage] = elapsed_us
+        if elapsed_us > self.max_us[stage]:
+            self.max_us[stage] = elapsed_us
+        if allocated > self.max_alloc[stage]:
+            self.max_alloc[stage] = allocated
+
+        self.counts[stage] = count + 1
+        self.total_us[stage] += elapsed_us
+        self.total_alloc[stage] += allocated
+
+        bucket = 0
+        while elapsed_us > 1 and bucket < self.NUM_OF_BUCKETS - 1:
+            elapsed_us >>= 1
+            bucket += 1
+        self.histograms[stage * self.NUM_OF_BUCKETS + bucket] += 1
+
+        if self.total_us[stage] >= self.TOTAL_LIMIT or self.total_alloc[stage] >= self.TOTAL_LIMIT or count + 1 >= self.TOTAL_LIMIT:
+            self.halve(stage)
+
+    def halve(self, stage: int) -> None:
+        offset = stage * self.NUM_OF_BUCKETS
+        old_count = self.counts[stage]
+        count = 0
+
+        # Rounding up keeps every seen bucket, the last sample included
+        for i in range(offset, offset + self.NUM_OF_BUCKETS):
+            self.histograms[i] = (self.histograms[i] + 1) >> 1
+            count += self.histograms[i]
+
+        # Count is taken from the halved histogram, so percentiles stay consistent with it,
+        # and totals are scaled by the averages, so they are kept as well
+        self.counts[stage] = count
+        self.total_us[stage] = self.total_us[stage] // old_count * count
+        self.total_alloc[stage] = self.total_alloc[stage] // old_count * count
+
+    def get_percentile_us(self, stage: int, percent: int) -> int:
+        count = self.counts[stage]
+        if count == 0:
+            return 0
+
+        # Smallest bucket holding at least `percent` of the samples
+        needed = (count * percent + 99) // 100
+        cumulative = 0
+        offset = stage * self.NUM_OF_BUCKETS
+        for bucket in range(self.NUM_OF_BUCKETS):
+            cumulative += self.histograms[offset + bucket]
+            if cumulative >= needed:
+                return min(1 << (bucket + 1), self.max_us[stage])
+
+        return self.max_us[stage]
+
+    def get_stats(self) -> dict:
+        stats = {"enabled": self.enabled}
+
+        for stage, name in enumerate(STAGE_NAMES):
+            count = self.counts[stage]
+
+            stats[name] = {
+                "count": count,
+                "min_us": self.min_us[stage],
+                "avg_us": self.total_us[stage] // count if count else 0,
+                "max_us": self.max_us[stage],
+                "p99_us": self.get_percentile_us(stage, 99),
+                "avg_alloc": self.total_alloc[stage] // count if count else 0,
+                "max_alloc": self.max_alloc[stage],
+            }
+
+        return stats
+
+    def asjson(self) -> str:
+        return json.dumps(self.get_stats())
@@ -1,40 +1,70 @@
 import json
 import uasyncio as asyncio
-from gc import collect as gc_collect
-import socket
-import select
+import utime
+from gc import collect as gc_collect, mem_alloc as gc_mem_alloc
 
 import app
+import profiler
 from communications import usb_
 
 class WebServer:
+    JSON_RESPONSE_HEADER = b"HTTP/1.1 200 OK\r\nContent-type: application/json\r\n\r\n"
 
-    def __init__(self, socket: socket.socket, app_state: app.AppState, app_config: app.AppConfig, usb_controller: usb_.USBController) -> None:
-        self.s = socket
+    def __init__(self, app_state: app.AppState, app_config: app.AppConfig, usb_controller: usb_.USBController) -> None:
         self.app_state = app_state
         self.app_config = app_config
         self.usb_controller = usb_controller
 
-        self.poll_obj = select.poll()
-        self.poll_obj.register(self.s, select.POLLIN)
+    async def send(self, writer: asyncio.StreamWriter, data: str|bytes) -> None:
+        if isinstance(data, str):
+            data = data.encode()
 
-    def respond_body_file(self, conn, file_path: str, mode: str="rb", buffer_size: int=1024) -> None:
+        writer.write(data)
+        await writer.drain()
+
+    async def respond_body_file(self, writer: asyncio.StreamWriter, file_path: str, mode: str="rb", buffer_size: int=1024) -> None:
         with open(file_path, mode) as f:
             while True:
                 data = f.read(buffer_size)
                 if not data:
                     break
-                conn.send(data)  
+                await self.send(writer, data)
 
-    def respond_file(self, conn, headers:tuple, file_path: str, *args, **kwargs):
+    async def respond_file(self, writer: asyncio.StreamWriter, headers:tuple, file_path: str, *args, **kwargs):
         header_line = "HTTP/1.1 200 OK\r\n" + "\r\n".join(headers) + "\r\n\r\n"
-        conn.send(header_line)
-        self.respond_body_file(conn, file_path, *args, **kwargs)
+        await self.send(writer, header_line)
+        await self.respond_body_file(writer, file_path, *args, **kwargs)
+
+    async def serve(self, host: str="0.0.0.0", port: int=80, backlog: int=5) -> None:
+        server = await asyncio.start_server(self.handle_connection, host, port, backlog)
+        await server.wait_closed()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Connections are served concurrently, so their start values are kept here instead of in the profiler's single slot
+        loop_profiler = self.app_state.profiler
+        if loop_profiler and loop_profiler.enabled:
+            start_us = utime.ticks_us()
+            start_alloc = gc_mem_alloc()
+        else:
+            loop_profiler = None
+
+        try:
+            await self.serve_client(reader, writer, writer.get_extra_info("peername"))
+        except OSError:
+            # Client went away in the middle of a response
+            pass
+        finally:
+            writer.close()
+            await writer.wait_closed()
 
+            if loop_profiler:
+                elapsed_us = utime.ticks_diff(utime.ticks_us(), start_us)
+                # A collection during the request makes the difference negative
+                loop_profiler.record(profiler.STAGE_WEB, elapsed_us, max(gc_mem_alloc() - start_alloc, 0))
 
-    def serve_client(self, conn, addr) -> None:
+    async def serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, addr) -> None:
         
-        request = conn.recv(1024)
+        request = await reader.read(1024)
         request = str(request)
 
         try:
@@ -60,14 +90,12 @@ class WebServer:
             print(f"Received http request from: {addr}, path: {url_path}, args: {url_args}")
 
         if url_path == "/api/measurements/list/" or url_path == "/api/measurements/list":
-            response = "HTTP/1.1 200 OK\r\nContent-type: application/json\r\n\r\n"
-            response +=  self.app_state.measurements_asjson()
-            conn.send(response)
+            await self.send(writer, self.JSON_RESPONSE_HEADER)
+            await self.send(writer, self.app_state.measurements_asbytes())
 
         elif url_path == "/api/state/list/" or url_path == "/api/state/list":
-            response = "HTTP/1.1 200 OK\r\nContent-type: application/json\r\n\r\n"
-            response += self.app_state.asjson()
-            conn.send(response)
+            await self.send(writer, self.JSON_RESPONSE_HEADER)
+            await self.send(writer, self.app_state.asbytes())
 
         elif url_path == "/api/command/" or url_path == "/api/command":
 
@@ -79,48 +107,53 @@ class WebServer:
             else:
                 response = "HTTP/1.1 409 Conflict\r\nContent-type: text/plain\r\n\r\n"
             
-            conn.send(response)
+            await self.send(writer, response)
+
+        elif url_path == "/api/perf/" or url_path == "/api/perf":
+            loop_profiler = self.app_state.profiler
+
+            if loop_profiler is not None:
+                response = "HTTP/1.1 200 OK\r\nContent-type: application/json\r\n\r\n"
+                response += loop_profiler.asjson()
+            else:
+                response = "HTTP/1.1 409 Conflict\r\nContent-type: text/plain\r\n\r\n"
+
+            await self.send(writer, response)
+
+        elif url_path == "/api/log/" or url_path == "/api/log":
+            logger = self.app_state.measurement_logger
+
+            try:
+                offset = int(url_args.get("offset", 0))
+                count = int(url_args.get("count", self.usb_controller.HISTORY_PAGE_LIMIT))
+            except ValueError:
+                offset = count = -1
+
+            if logger is not None and offset >= 0 and 1 <= count <= self.usb_controller.HISTORY_PAGE_LIMIT:
+                response = "HTTP/1.1 200 OK\r\nContent-type: application/json\r\n\r\n"
+                response += logger.page_asjson(offset, count)
+            else:
+                response = "HTTP/1.1 409 Conflict\r\nContent-type: text/plain\r\n\r\n"
+
+            await self.send(writer, response)
 
         elif url_path == "/console/" or url_path == "/console":
             headers = ("Content-type: text/html", "Cache-Control: max-age=3600")
-            self.respond_file(conn, headers, "web/assets/command_console.html")
+            await self.respond_file(writer, headers, "web/assets/command_console.html")
 
         elif url_path == "/scripts.js":
             headers = ("Content-type: text/javascript", "Cache-Control: max-age=31536000")  
-            self.respond_file(conn, headers, "web/assets/scripts.js")
+            await self.respond_file(writer, headers, "web/assets/scripts.js")
 
         elif url_path == "/styles.css":
             headers = ("Content-type: text/css", "Cache-Control: max-age=31536000")  
-            self.respond_file(conn, headers, "web/assets/styles.css")
+            await self.respond_file(writer, headers, "web/assets/styles.css")
 
         elif url_path == "/favicon.ico":
             headers = ("Cache-Control: max-age=31536000",)  
-            self.respond_file(conn, headers, "web/assets/favicon.ico")
+            await self.respond_file(writer, headers, "web/assets/favicon.ico")
 
 
         else:
             headers = ("Content-type: text/html", "Cache-Control: max-age=3600")
-            self.respond_file(conn, headers, "web/assets/index.html")   
-
-
-    def run(self, timeout_ms: int=3):
-        
-        poll_results = self.poll_obj.poll(timeout_ms) 
-        if poll_results:
-
-            try:
-                conn, addr = self.s.accept()
-                self.serve_client(conn, addr)
-
-                conn.close()
-
-            except OSError as e:
-
-                if e.args[0] == 110:
-                    #ETIMEDOUT
-                    pass
-                elif e.args[0] == 11:
-                    #EAGAIN
-                    pass
-                else:
-                    conn.close()
+            await self.respond_file(writer, headers, "web/assets/index.html")   